@@ -6,13 +6,15 @@ is_sublime_text_3 = int(sublime.version()) >= 3000
 
 if is_sublime_text_3:
     from .settings import Settings
-    from .status_bar import StatusBar
     from .insert_in_output_view import insert_in_output_view
+    from .output_buffer import OutputBuffer
+    from .output_archive import OutputArchive
     from .timeout import set_timeout, defer_sync
 else:
     from settings import Settings
-    from status_bar import StatusBar
     from insert_in_output_view import insert_in_output_view
+    from output_buffer import OutputBuffer
+    from output_archive import OutputArchive
     from timeout import set_timeout, defer_sync
 
 
@@ -21,22 +23,25 @@ else:
 #
 
 class BaseCommand(sublime_plugin.WindowCommand):
-    def run(self, task_name=None, task_flag=None, silent=False, paths=[]):
+    def run(self, task_name=None, task_flag=None, silent=False, paths=[], append_output=False):
         self.settings = None
         self.setup_data_from_settings()
         self.task_name = task_name
         self.task_flag = task_flag if task_name is not None and task_flag is not None else self.get_flag_from_task_name()
         self.silent = silent
+        # Keep what the output panel has instead of starting it over
+        self.append_output = append_output
         self._working_dir = ""
         self.searchable_folders = [os.path.dirname(path) for path in paths] if len(paths) > 0 else self.window.folders()
         self.output_view = None
-        self.status_bar = StatusBar(self.window)
+        self.output_buffer = OutputBuffer(self.write_to_output_view)
         self.work()
 
     def setup_data_from_settings(self):
-        Settings.gather_shared_data()
-        self.settings = Settings()
+        Settings.gather_shared_data(self.window)
+        self.settings = Settings(self.window)
         self.results_in_new_tab = self.settings.get("results_in_new_tab", False)
+        self.results_max_lines = self.settings.get("results_max_lines", 0)
         self.check_for_gulpfile = self.settings.get('check_for_gulpfile', True)
 
     def get_flag_from_task_name(self):
@@ -60,8 +65,11 @@ class BaseCommand(sublime_plugin.WindowCommand):
         pass
 
     # Panels and message
-    def show_quick_panel(self, items, on_done=None, font=sublime.MONOSPACE_FONT):
-        defer_sync(lambda: self.window.show_quick_panel(items, on_done, font))
+    def show_quick_panel(self, items, on_done=None, font=sublime.MONOSPACE_FONT, selected_index=-1):
+        if is_sublime_text_3:
+            defer_sync(lambda: self.window.show_quick_panel(items, on_done, font, selected_index))
+        else:
+            defer_sync(lambda: self.window.show_quick_panel(items, on_done, font))
 
     def show_input_panel(self, caption, initial_text="", on_done=None, on_change=None, on_cancel=None):
         self.window.show_input_panel(caption, initial_text, on_done, on_change, on_cancel)
@@ -83,13 +91,22 @@ class BaseCommand(sublime_plugin.WindowCommand):
             self.output_view = self.window.open_file(new_tab_path)
             self.output_view.set_scratch(True)
         else:
-            self.output_view = self.window.get_output_panel("gulp_output")
+            self.output_view = self.find_output_panel() if self.append_output else None
+            if self.output_view is None:
+                self.output_view = self.window.get_output_panel("gulp_output")
+                OutputArchive.cleared(self.output_view)
             self.show_panel()
 
         self.output_view.settings().set("scroll_past_end", False)
         self.add_syntax()
         self.append_to_output_view(text)
 
+    def find_output_panel(self):
+        # get_output_panel empties the panel, find_output_panel (newer builds only) doesn't
+        if hasattr(self.window, "find_output_panel"):
+            return self.window.find_output_panel("gulp_output")
+        return None
+
     def gulp_results_path(self):
         return next(folder_path for folder_path in self.searchable_folders if self.working_dir.find(folder_path) != -1) if self.working_dir else ""
 
@@ -110,11 +127,17 @@ class BaseCommand(sublime_plugin.WindowCommand):
             self.output_view.set_syntax_file(syntax_file)
 
     def append_to_output_view_in_main_thread(self, text):
-        defer_sync(lambda: self.append_to_output_view(text))
+        self.output_buffer.append(text)
+
+    def flush_output_view(self):
+        self.output_buffer.flush()
 
     def append_to_output_view(self, text):
         if not self.silent:
-            insert_in_output_view(self.output_view, text, self.results_in_new_tab)
+            self.write_to_output_view(text)
+
+    def write_to_output_view(self, text):
+        insert_in_output_view(self.output_view, text, self.results_in_new_tab, self.results_max_lines)
 
     def set_output_close_on_timeout(self):
         timeout = self.settings.get("results_autoclose_timeout_in_milliseconds", False)
@@ -0,0 +1,63 @@
+"""
+Prints what a gulp task would, at a configurable volume (used through the `gulp` shim created by harness.py):
+
+    GULP_BENCH_LINES        lines to print (default 10000)
+    GULP_BENCH_LINE_LENGTH  characters on each line, before the colors (default 80)
+    GULP_BENCH_BURST        lines written on each flush (default 100)
+    GULP_BENCH_STAMP_EVERY  every how many lines to include the time they were written at (default 100),
+                            formatted as @<time>@ so the benchmark can measure how long they took to show up
+    GULP_BENCH_REBUILD_EVERY  every how many lines to log a "rebuild" sub-task, like a watcher does (default 0, never)
+    GULP_BENCH_WAIT         if set, keep running after printing everything until killed, like a watcher
+"""
+import os
+import sys
+import time
+
+COLORS = ["\x1b[32m", "\x1b[36m", "\x1b[35m", "\x1b[33m"]
+RESET = "\x1b[39m"
+
+
+def now():
+    return time.strftime("%H:%M:%S")
+
+
+def main(args):
+    task_name = args[0] if args else "default"
+    lines = int(os.environ.get("GULP_BENCH_LINES", 10000))
+    line_length = int(os.environ.get("GULP_BENCH_LINE_LENGTH", 80))
+    burst = max(int(os.environ.get("GULP_BENCH_BURST", 100)), 1)
+    stamp_every = max(int(os.environ.get("GULP_BENCH_STAMP_EVERY", 100)), 1)
+    rebuild_every = int(os.environ.get("GULP_BENCH_REBUILD_EVERY", 0))
+
+    out = sys.stdout
+    started = time.time()
+    out.write("[%s] Using gulpfile %s\n" % (now(), os.path.join(os.getcwd(), "gulpfile.js")))
+    out.write("[%s] Starting '%s'...\n" % (now(), task_name))
+
+    filler = ("lorem ipsum dolor sit amet " * (line_length // 27 + 1))[:line_length]
+    chunk = []
+    for index in range(lines):
+        color = COLORS[index % len(COLORS)]
+        stamp = "@%.6f@ " % time.time() if index % stamp_every == 0 else ""
+        chunk.append("[\x1b[90m%s\x1b[39m] %s%s%s%s\n" % (now(), stamp, color, filler, RESET))
+
+        if rebuild_every and index % rebuild_every == 0:
+            chunk.append("[%s] Starting 'rebuild'...\n" % now())
+            chunk.append("[%s] Finished 'rebuild' after 12 ms\n" % now())
+
+        if len(chunk) >= burst:
+            out.write("".join(chunk))
+            out.flush()
+            chunk = []
+
+    out.write("".join(chunk))
+    out.write("[%s] Finished '%s' after %d ms\n" % (now(), task_name, (time.time() - started) * 1000))
+    out.flush()
+
+    if os.environ.get("GULP_BENCH_WAIT"):
+        while True:
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
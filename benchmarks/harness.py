@@ -0,0 +1,165 @@
+"""
+Loads the package with the stub `sublime` modules and builds the fixtures used by the benchmarks
+"""
+import atexit
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import types
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_PATH = os.path.dirname(BENCHMARKS_PATH)
+
+sys.path.insert(0, os.path.join(BENCHMARKS_PATH, "stubs"))
+
+import sublime  # noqa: E402
+
+
+def load_package():
+    """ Imports the repository as the `Gulp` package, the way the editor does """
+    if "Gulp" not in sys.modules:
+        package = types.ModuleType("Gulp")
+        package.__path__ = [PACKAGE_PATH]
+        sys.modules["Gulp"] = package
+
+        # The scripts run by node are looked up on the package folder, the cache files are written there too
+        installed_path = os.path.join(sublime.packages_path(), "Gulp")
+        os.makedirs(installed_path)
+        for name in ("write_tasks_to_cache.js", "tasks_worker.js"):
+            shutil.copy(os.path.join(PACKAGE_PATH, name), installed_path)
+
+    import Gulp.gulp
+    return Gulp.gulp
+
+
+def set_settings(**settings):
+    user_settings = sublime.load_settings("Gulp.sublime-settings")
+    for (key, value) in settings.items():
+        user_settings.set(key, value)
+
+
+def temp_dir(name):
+    path = tempfile.mkdtemp(prefix="gulp-benchmarks-%s-" % name)
+    atexit.register(shutil.rmtree, path, True)
+    return path
+
+
+def write(path, content):
+    dirpath = os.path.dirname(path)
+    if not os.path.isdir(dirpath):
+        os.makedirs(dirpath)
+    with open(path, "w") as target:
+        target.write(content)
+
+
+def gulp_shim():
+    """ A folder with a `gulp` executable running fake_gulp.py, to be prepended to PATH through `exec_args` """
+    bin_path = temp_dir("bin")
+    fake_gulp = os.path.join(BENCHMARKS_PATH, "fake_gulp.py")
+
+    if os.name == "nt":
+        write(os.path.join(bin_path, "gulp.cmd"), '@"%s" "%s" %%*\r\n' % (sys.executable, fake_gulp))
+    else:
+        shim = os.path.join(bin_path, "gulp")
+        write(shim, '#!/bin/sh\nexec "%s" "%s" "$@"\n' % (sys.executable, fake_gulp))
+        os.chmod(shim, os.stat(shim).st_mode | stat.S_IEXEC)
+
+    return bin_path
+
+
+def output_project():
+    project_path = temp_dir("output")
+    write(os.path.join(project_path, "gulpfile.js"), "var gulp = require('gulp');\ngulp.task('bench', function() {});\n")
+    return project_path
+
+
+FAKE_GULP_MODULE = """
+// Enough of the gulp 3 API for write_tasks_to_cache.js
+function Gulp() { this.tasks = {}; }
+Gulp.prototype.task = function(name, dep, fn) {
+    if (typeof dep === "function") { dep = []; }
+    this.tasks[name] = { name: name, dep: dep || [] };
+};
+module.exports = new Gulp();
+"""
+
+
+def tasks_project(task_files=20, tasks_per_file=10):
+    """ A gulpfile requiring `task_files` files from tasks/, each one defining `tasks_per_file` tasks """
+    project_path = temp_dir("tasks")
+    write(os.path.join(project_path, "node_modules", "gulp", "index.js"), FAKE_GULP_MODULE)
+
+    requires = []
+    for file_index in range(task_files):
+        name = "tasks/file%d.js" % file_index
+        tasks = ["gulp.task('task%d_%d', ['task%d_0'], function() {});" % (file_index, task_index, file_index) for task_index in range(1, tasks_per_file)]
+        tasks.insert(0, "gulp.task('task%d_0', function() {});" % file_index)
+        write(os.path.join(project_path, name), "var gulp = require('gulp');\n%s\n" % "\n".join(tasks))
+        requires.append("require('./%s');" % name)
+
+    write(os.path.join(project_path, "gulpfile.js"), "var gulp = require('gulp');\n%s\n" % "\n".join(requires))
+    return project_path
+
+
+def gulpfile_tree(depth=4, breadth=5, gulpfile_every=7, node_modules=True):
+    """
+    `breadth` ** `depth` folders with a gulpfile on every `gulpfile_every`th one.
+    Every folder with a gulpfile gets a node_modules folder too, which should be ignored by the search.
+    """
+    root = temp_dir("tree")
+    counter = [0]
+
+    def build(path, level):
+        counter[0] += 1
+        if counter[0] % gulpfile_every == 0:
+            write(os.path.join(path, "gulpfile.js"), "")
+            if node_modules:
+                for index in range(breadth):
+                    write(os.path.join(path, "node_modules", "dep%d" % index, "index.js"), "")
+        write(os.path.join(path, "README.md"), "")
+
+        if level < depth:
+            for index in range(breadth):
+                child = os.path.join(path, "folder%d" % index)
+                os.makedirs(child)
+                build(child, level + 1)
+
+    build(root, 0)
+    return (root, counter[0])
+
+
+def percentile(values, percent):
+    if not values:
+        return None
+    values = sorted(values)
+    index = max(int(round(percent / 100.0 * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def timed(fn, *args):
+    started = time.time()
+    result = fn(*args)
+    return (time.time() - started, result)
+
+
+def wait_for(condition, timeout=120, interval=0.005):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def dump(results, path):
+    with open(path, "w") as target:
+        json.dump(results, target, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as source:
+        return json.load(source)
@@ -0,0 +1,264 @@
+"""
+Headless benchmarks of the output and process pipeline, run outside the editor with the stubs on benchmarks/stubs.
+
+    python benchmarks/run.py                          # every benchmark
+    python benchmarks/run.py output list_tasks        # some of them
+    python benchmarks/run.py --json after.json --compare before.json
+
+Results can be saved with --json and compared against a previous run with --compare,
+to check a change commit to commit. `list_tasks` needs node on the PATH.
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import time
+from collections import OrderedDict
+
+import harness
+import sublime
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(fn):
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+@benchmark
+def decode(options):
+    """ decode_line on each line (the default reader) against LineDecoder on 64KB chunks (chunked_output_reader) """
+    from Gulp.cross_platform_codecs import CrossPlatformCodecs, LineDecoder
+
+    lines = [("[\x1b[90m10:00:00\x1b[39m] \x1b[36mline %d lorem ipsum dolor sit amet\x1b[39m\n" % index).encode("utf-8") for index in range(options.lines)]
+    data = b"".join(lines)
+
+    (line_elapsed, _) = harness.timed(lambda: [CrossPlatformCodecs.decode_line(line) for line in lines])
+
+    def decode_chunks():
+        decoder = LineDecoder()
+        decoded = []
+        for offset in range(0, len(data), 64 * 1024):
+            decoded.extend(decoder.feed(data[offset:offset + 64 * 1024]))
+        decoded.extend(decoder.flush())
+        return decoded
+
+    (chunk_elapsed, decoded) = harness.timed(decode_chunks)
+    assert len(decoded) == len(lines)
+
+    return OrderedDict([
+        ("decode_line lines/s", len(lines) / line_elapsed),
+        ("LineDecoder lines/s", len(lines) / chunk_elapsed),
+        ("LineDecoder MB/s", len(data) / chunk_elapsed / 1e6)
+    ])
+
+
+OUTPUT_MODES = OrderedDict([
+    ("threads", { "nonblocking": True, "chunked_output_reader": False }),
+    ("threads_chunked", { "nonblocking": True, "chunked_output_reader": True }),
+    ("selector", { "nonblocking": "selector", "chunked_output_reader": False })
+])
+
+STAMP = re.compile(r"@(\d+\.\d+)@")
+
+
+@benchmark
+def output(options):
+    """ A task printing `--lines` colored lines: fake gulp -> CrossPlatformProcess -> decoding -> OutputBuffer -> output view """
+    project_path = harness.output_project()
+    gulpfile = os.path.join(project_path, "gulpfile.js")
+    exec_path = harness.gulp_shim() + os.pathsep + os.environ.get("PATH", "")
+
+    os.environ["GULP_BENCH_LINES"] = str(options.lines)
+    os.environ["GULP_BENCH_STAMP_EVERY"] = str(max(options.lines // 1000, 1))
+
+    results = OrderedDict()
+    for (mode, mode_settings) in OUTPUT_MODES.items():
+        if mode == "selector" and sublime.platform() == "windows":
+            continue
+
+        harness.set_settings(exec_args={ "path": exec_path }, results_in_new_tab=False, log_errors=False, **mode_settings)
+        window = sublime.Window([project_path])
+
+        inserts = { "lines": 0, "last": None }
+        latencies = []
+
+        def on_insert(view, text):
+            now = time.time()
+            inserts["lines"] += text.count("\n")
+            inserts["last"] = now
+            latencies.extend(now - float(stamp) for stamp in STAMP.findall(text))
+
+        sublime.reset()
+        sublime.on_insert = on_insert
+        started = time.time()
+        window.run_command("gulp", { "task_name": "bench", "gulpfile": gulpfile })
+
+        finished = harness.wait_for(lambda: any("finished" in message for message in sublime.status_messages()))
+        sublime.MAIN.drain()
+        sublime.on_insert = None
+        if not finished:
+            raise Exception("The %s run didn't finish, status messages: %s" % (mode, sublime.status_messages()))
+
+        elapsed = inserts["last"] - started
+        results["%s lines/s" % mode] = options.lines / elapsed
+        results["%s elapsed s" % mode] = elapsed
+        results["%s latency p50 ms" % mode] = harness.percentile(latencies, 50) * 1000
+        results["%s latency p95 ms" % mode] = harness.percentile(latencies, 95) * 1000
+        results["%s latency p99 ms" % mode] = harness.percentile(latencies, 99) * 1000
+        results["%s main thread callbacks" % mode] = sublime.stats["main_callbacks"]
+        results["%s main thread busy s" % mode] = sublime.MAIN.busy_time
+        results["%s view inserts" % mode] = sublime.stats["view_insert"]
+
+    return results
+
+
+@benchmark
+def list_tasks(options):
+    """ GulpCommand.list_tasks on a gulpfile loading 20 files with 200 tasks: cold (node), after a restart and warm """
+    if not shutil.which("node"):
+        print("  node is not on the PATH, skipping")
+        return OrderedDict()
+
+    gulp = harness.load_package()
+    from Gulp.caches import TaskCache
+    from Gulp.hasher import Hasher
+    from Gulp.node_worker import NodeWorker
+
+    project_path = harness.tasks_project()
+    cache_path = os.path.join(project_path, ".sublime-gulp.cache")
+    window = sublime.Window([project_path])
+
+    def command(**settings):
+        harness.set_settings(exec_args=False, **settings)
+        cmd = gulp.GulpCommand(window)
+        cmd.setup_data_from_settings()
+        cmd.silent = True
+        cmd.working_dir = os.path.join(project_path, "gulpfile.js")
+        return cmd
+
+    def restart(remove_cache):
+        TaskCache._entries.clear()
+        Hasher._memo.clear()
+        if remove_cache and os.path.exists(cache_path):
+            os.remove(cache_path)
+
+    def measure(cmd, repeat, remove_cache=None):
+        durations = []
+        for index in range(repeat):
+            if remove_cache is not None:
+                restart(remove_cache)
+            (elapsed, tasks) = harness.timed(cmd.list_tasks)
+            assert tasks and len(tasks) == 200, tasks
+            durations.append(elapsed * 1000)
+        return durations
+
+    results = OrderedDict()
+
+    def add(name, durations):
+        results["%s p50 ms" % name] = harness.percentile(durations, 50)
+        results["%s p95 ms" % name] = harness.percentile(durations, 95)
+
+    add("cold node", measure(command(node_worker=False), options.repeat, remove_cache=True))
+
+    worker_cmd = command(node_worker=True)
+    add("cold node worker (first)", measure(worker_cmd, 1, remove_cache=True))
+    add("cold node worker", measure(worker_cmd, options.repeat, remove_cache=True))
+    NodeWorker.stop()
+
+    add("restart", measure(command(node_worker=False), options.repeat, remove_cache=False))
+    add("warm", measure(command(node_worker=False), options.repeat * 100))
+
+    return results
+
+
+@benchmark
+def discovery(options):
+    """ Recursive gulpfile search on a synthetic tree: cold, after a restart (index on disk) and warm """
+    gulp = harness.load_package()
+    from Gulp.gulpfile_index import GulpfileIndex
+
+    (root, folder_count) = harness.gulpfile_tree()
+    window = sublime.Window([root])
+
+    def command(**settings):
+        harness.set_settings(**settings)
+        cmd = gulp.GulpCommand(window)
+        cmd.setup_data_from_settings()
+        cmd.searchable_folders = [root]
+        return cmd
+
+    def measure(cmd, repeat, forget=None):
+        durations = []
+        for index in range(repeat):
+            if forget == "disk":
+                GulpfileIndex.forget([root])
+            if forget is not None:
+                GulpfileIndex.folders = None
+            (elapsed, _) = harness.timed(cmd.find_gulp_files)
+            durations.append(elapsed * 1000)
+        return (durations, len(cmd.gulp_files))
+
+    results = OrderedDict([("folders", folder_count)])
+
+    def add(name, measured):
+        (durations, found) = measured
+        results["%s p50 ms" % name] = harness.percentile(durations, 50)
+        results["%s p95 ms" % name] = harness.percentile(durations, 95)
+        results["%s gulpfiles" % name] = found
+
+    recursive = command(recursive_gulpfile_search=True)
+    add("cold", measure(recursive, options.repeat, forget="disk"))
+    add("restart", measure(recursive, options.repeat, forget="memory"))
+    add("warm", measure(recursive, options.repeat))
+    add("top level only", measure(command(recursive_gulpfile_search=False), options.repeat))
+
+    return results
+
+
+def print_results(name, results, previous=None):
+    print("\n%s" % name)
+    for (metric, value) in results.items():
+        line = "  %-42s %14s" % (metric, format_value(value))
+        if previous and metric in previous and previous[metric]:
+            change = (value - previous[metric]) / float(previous[metric]) * 100
+            line += "   was %14s (%+.1f%%)" % (format_value(previous[metric]), change)
+        print(line)
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return "%.2f" % value
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the Gulp package")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run, all of them by default: %s" % ", ".join(BENCHMARKS.keys()))
+    parser.add_argument("--lines", type=int, default=50000, help="lines printed by the fake gulp and decoded (default 50000)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each list_tasks and discovery case (default 5)")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", help="results of a previous --json run to compare with")
+    options = parser.parse_args()
+
+    unknown = [name for name in options.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmark(s): %s (choose from %s)" % (", ".join(unknown), ", ".join(BENCHMARKS.keys())))
+
+    harness.load_package()
+    previous = harness.load(options.compare) if options.compare else {}
+
+    results = OrderedDict()
+    for name in options.benchmarks or BENCHMARKS.keys():
+        print("Running %s..." % name)
+        results[name] = BENCHMARKS[name](options)
+        print_results(name, results[name], previous.get(name))
+
+    if options.json:
+        harness.dump(results, options.json)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
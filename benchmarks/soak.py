@@ -0,0 +1,153 @@
+"""
+Memory soak test: hours of watch output and task start/kill cycles, compressed in time, with tracemalloc on.
+
+    python benchmarks/soak.py
+    python benchmarks/soak.py --lines 2000000 --cycles 500
+
+1. Watch: a fake watcher prints `--lines` lines (logging a rebuild every 50 lines) and keeps running.
+   Memory is measured once the first half of the lines was shown and again at the end, the growth between
+   both divided by the lines in between must stay under `--line-budget` bytes.
+2. Cycles: a watcher is started, prints `--cycle-lines` lines and is killed with gulp_kill, `--cycles` times.
+   The memory retained after the warm up cycles divided by the rest must stay under `--process-budget` bytes.
+
+Exits with 1 if a budget is exceeded, printing where the memory was allocated.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import harness
+import sublime
+
+
+class Soak():
+    def __init__(self, options):
+        self.options = options
+        self.project_path = harness.output_project()
+        self.gulpfile = os.path.join(self.project_path, "gulpfile.js")
+        self.window = sublime.Window([self.project_path])
+        self.lines = 0
+        self.failures = []
+
+        harness.set_settings(
+            exec_args={ "path": harness.gulp_shim() + os.pathsep + os.environ.get("PATH", "") },
+            nonblocking=options.nonblocking,
+            results_in_new_tab=False,
+            log_errors=False
+        )
+        os.environ["GULP_BENCH_WAIT"] = "1"
+        os.environ["GULP_BENCH_REBUILD_EVERY"] = "50"
+        sublime.on_insert = self.on_insert
+
+    def on_insert(self, view, text):
+        self.lines += text.count("\n")
+
+    def start(self, lines):
+        from Gulp.caches import ProcessCache
+
+        os.environ["GULP_BENCH_LINES"] = str(lines)
+        expected = self.lines + lines
+        self.window.run_command("gulp", { "task_name": "watch", "gulpfile": self.gulpfile })
+        if not harness.wait_for(lambda: self.lines >= expected and not ProcessCache.empty()):
+            raise Exception("The watcher only printed %d of %d lines" % (self.lines, expected))
+
+    def wait_for_lines(self, count):
+        if not harness.wait_for(lambda: self.lines >= count):
+            raise Exception("Only %d of %d lines were shown" % (self.lines, count))
+
+    def kill(self):
+        from Gulp.caches import ProcessCache
+
+        self.window.run_command("gulp_kill")
+        harness.wait_for(ProcessCache.empty)
+        self.settle()
+
+    def settle(self):
+        # Lets the readers, the reaper and the main thread catch up before measuring
+        time.sleep(0.2)
+        sublime.MAIN.drain()
+        sublime.ASYNC.drain()
+
+    def measure(self):
+        self.settle()
+        gc.collect()
+        # The snapshots themselves are traced too, they are left out
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        return (snapshot, sum(stat.size for stat in snapshot.statistics("filename")))
+
+    def check(self, name, before, after, units, budget):
+        (snapshot_before, memory_before) = before
+        (snapshot_after, memory_after) = after
+        per_unit = (memory_after - memory_before) / float(units)
+
+        print("  %-28s %10.1f bytes (budget %d)" % (name, per_unit, budget))
+        if per_unit > budget:
+            self.failures.append(name)
+            print("  Over budget, largest growth:")
+            for stat in snapshot_after.compare_to(snapshot_before, "lineno")[:10]:
+                print("    %s" % stat)
+
+    def watch(self):
+        print("Watch session: %d lines" % self.options.lines)
+        half = self.options.lines // 2
+        start_lines = self.lines
+
+        os.environ["GULP_BENCH_LINES"] = str(self.options.lines)
+        self.window.run_command("gulp", { "task_name": "watch", "gulpfile": self.gulpfile })
+
+        self.wait_for_lines(start_lines + half)
+        middle = self.measure()
+        middle_lines = self.lines
+
+        self.wait_for_lines(start_lines + self.options.lines)
+        end = self.measure()
+
+        self.check("retained per output line", middle, end, max(self.lines - middle_lines, 1), self.options.line_budget)
+        self.kill()
+
+    def cycles(self):
+        print("Start/kill cycles: %d, %d lines each" % (self.options.cycles, self.options.cycle_lines))
+        warm_up = min(10, self.options.cycles // 2)
+
+        for index in range(warm_up):
+            self.start(self.options.cycle_lines)
+            self.kill()
+        before = self.measure()
+
+        for index in range(self.options.cycles - warm_up):
+            self.start(self.options.cycle_lines)
+            self.kill()
+        after = self.measure()
+
+        self.check("retained per process", before, after, max(self.options.cycles - warm_up, 1), self.options.process_budget)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory soak test of the Gulp package")
+    parser.add_argument("--lines", type=int, default=500000, help="lines printed by the watcher (default 500000)")
+    parser.add_argument("--cycles", type=int, default=100, help="start/kill cycles (default 100)")
+    parser.add_argument("--cycle-lines", type=int, default=1000, help="lines printed on each cycle (default 1000)")
+    parser.add_argument("--line-budget", type=float, default=2, help="bytes each output line may retain (default 2)")
+    parser.add_argument("--process-budget", type=int, default=16 * 1024, help="bytes each finished process may retain (default 16384)")
+    parser.add_argument("--nonblocking", default=True, type=lambda value: value if value == "selector" else value != "false", help='reader mode: true, false or "selector"')
+    options = parser.parse_args()
+
+    harness.load_package()
+    tracemalloc.start(10)
+
+    soak = Soak(options)
+    soak.watch()
+    soak.cycles()
+
+    if soak.failures:
+        print("Over budget: %s" % ", ".join(soak.failures))
+        return 1
+    print("Within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
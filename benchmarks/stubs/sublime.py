@@ -0,0 +1,406 @@
+"""
+Headless stand-in for the `sublime` module, enough to run the package outside the editor.
+
+`set_timeout` callbacks run on a MAIN thread and `set_timeout_async` ones on an ASYNC thread,
+in due order like the editor does. Every callback and view operation is counted on `stats`.
+"""
+import atexit
+import bisect
+import heapq
+import shutil
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+
+MONOSPACE_FONT = 1
+ENCODED_POSITION = 1
+TRANSIENT = 4
+
+stats = Counter()
+_packages_path = tempfile.mkdtemp(prefix="gulp-benchmarks-packages-")
+atexit.register(shutil.rmtree, _packages_path, True)
+_settings = {}
+_windows = []
+
+
+def version():
+    return "3211"
+
+
+def platform():
+    return "windows" if os.name == "nt" else ("osx" if os.uname()[0] == "Darwin" else "linux")
+
+
+def arch():
+    return "x64"
+
+
+def packages_path():
+    return _packages_path
+
+
+def status_message(text):
+    stats["status_messages"] += 1
+    _status_messages.append(text)
+
+
+def error_message(text):
+    stats["error_messages"] += 1
+    _status_messages.append(text)
+
+
+def message_dialog(text):
+    status_message(text)
+
+
+_status_messages = []
+
+# Called with (view, text) on every insert, used to measure latencies
+on_insert = None
+
+
+def status_messages():
+    return _status_messages
+
+
+class CallbackThread(threading.Thread):
+    """ Runs callbacks in due order, like the main (UI) and async threads of the editor """
+
+    def __init__(self, name):
+        threading.Thread.__init__(self, name=name)
+        self.daemon = True
+        self.condition = threading.Condition()
+        self.pending = []
+        self.counter = itertools.count()
+        self.busy = 0
+        self.busy_time = 0.0
+
+    def schedule(self, fn, delay):
+        with self.condition:
+            heapq.heappush(self.pending, (time.time() + delay / 1000.0, next(self.counter), fn))
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending or self.pending[0][0] > time.time():
+                    timeout = self.pending[0][0] - time.time() if self.pending else None
+                    self.condition.wait(timeout)
+                (due, count, fn) = heapq.heappop(self.pending)
+                self.busy += 1
+
+            started = time.time()
+            try:
+                fn()
+            except Exception:
+                import traceback
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    self.busy -= 1
+                    self.busy_time += time.time() - started
+                    stats["%s_callbacks" % self.name] += 1
+                    self.condition.notify_all()
+
+    def idle(self):
+        with self.condition:
+            return not self.pending and not self.busy
+
+    def drain(self, timeout=60):
+        """ Waits until every callback due by now (and the ones they schedule) ran """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.idle():
+                return True
+            time.sleep(0.001)
+        return False
+
+
+MAIN = CallbackThread("main")
+ASYNC = CallbackThread("async")
+MAIN.start()
+ASYNC.start()
+
+
+def set_timeout(fn, delay=0):
+    MAIN.schedule(fn, delay)
+
+
+def set_timeout_async(fn, delay=0):
+    ASYNC.schedule(fn, delay)
+
+
+def reset():
+    """ Clears the counters between benchmarks """
+    stats.clear()
+    del _status_messages[:]
+    MAIN.busy_time = 0.0
+    ASYNC.busy_time = 0.0
+
+
+class Settings(object):
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+        self.callbacks = {}
+
+    def get(self, key, default=None):
+        stats["settings_get"] += 1
+        return self.values.get(key, default)
+
+    def has(self, key):
+        stats["settings_has"] += 1
+        return key in self.values
+
+    def set(self, key, value):
+        self.values[key] = value
+        for fn in list(self.callbacks.values()):
+            fn()
+
+    def erase(self, key):
+        self.values.pop(key, None)
+
+    def add_on_change(self, key, fn):
+        self.callbacks[key] = fn
+
+    def clear_on_change(self, key):
+        self.callbacks.pop(key, None)
+
+
+def load_settings(name):
+    if name not in _settings:
+        _settings[name] = Settings(_read_package_settings(name))
+    return _settings[name]
+
+
+def _read_package_settings(name):
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), name)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as settings_file:
+        source = settings_file.read()
+    # Line comments outside of strings
+    source = re.sub(r'("(?:\\.|[^"\\])*")|//[^\n]*', lambda match: match.group(1) or "", source)
+    return json.loads(source)
+
+
+class Region(object):
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+
+class Selection(list):
+    def clear(self):
+        del self[:]
+
+    def add(self, region):
+        self.append(region)
+
+
+class View(object):
+    _ids = itertools.count(1)
+
+    def __init__(self, window=None, name=""):
+        self._id = next(View._ids)
+        self._window = window
+        self._settings = Settings()
+        self._name = name
+        self._size = 0
+        # Offsets of each newline since the view was created (text is only appended and erased from the head)
+        self._newlines = []
+        self._erased = 0
+        self._read_only = False
+        self._status = {}
+        self._sel = Selection()
+
+    def id(self):
+        return self._id
+
+    def window(self):
+        return self._window
+
+    def settings(self):
+        return self._settings
+
+    def file_name(self):
+        return None
+
+    def name(self):
+        return self._name
+
+    def set_name(self, name):
+        self._name = name
+
+    def size(self):
+        return self._size
+
+    def is_loading(self):
+        return False
+
+    def set_read_only(self, read_only):
+        stats["view_set_read_only"] += 1
+        self._read_only = read_only
+
+    def is_read_only(self):
+        return self._read_only
+
+    def set_scratch(self, scratch):
+        pass
+
+    def set_syntax_file(self, syntax):
+        pass
+
+    def assign_syntax(self, syntax):
+        pass
+
+    def set_viewport_position(self, position, animate=True):
+        stats["view_set_viewport_position"] += 1
+
+    def sel(self):
+        return self._sel
+
+    def show(self, *args):
+        pass
+
+    def set_status(self, key, value):
+        stats["view_set_status"] += 1
+        self._status[key] = value
+
+    def erase_status(self, key):
+        stats["view_erase_status"] += 1
+        self._status.pop(key, None)
+
+    def get_status(self, key):
+        return self._status.get(key, "")
+
+    def insert(self, edit, point, text):
+        stats["view_insert"] += 1
+        stats["view_inserted_chars"] += len(text)
+        start = self._erased + self._size
+        index = text.find("\n")
+        while index != -1:
+            self._newlines.append(start + index)
+            index = text.find("\n", index + 1)
+        self._size += len(text)
+        if on_insert is not None:
+            on_insert(self, text)
+
+    def erase(self, edit, region):
+        stats["view_erase"] += 1
+        self._size -= region.end() - region.begin()
+        self._erased += region.end() - region.begin()
+        del self._newlines[:bisect.bisect_left(self._newlines, self._erased)]
+
+    def clear(self):
+        self._erased += self._size
+        self._size = 0
+        del self._newlines[:]
+
+    def rowcol(self, point):
+        row = bisect.bisect_left(self._newlines, self._erased + point)
+        return (row, point - self.text_point(row, 0))
+
+    def text_point(self, row, col):
+        return (self._newlines[row - 1] + 1 - self._erased if row > 0 else 0) + col
+
+    def run_command(self, name, args=None):
+        stats["view_command_%s" % name] += 1
+        import sublime_plugin
+        sublime_plugin.run_text_command(self, name, args or {})
+
+
+class Window(object):
+    _ids = itertools.count(1)
+
+    def __init__(self, folders=None):
+        self._id = next(Window._ids)
+        self._folders = list(folders or [])
+        self._views = [View(self)]
+        self._panels = {}
+        self._project_data = {}
+        self.quick_panels = []
+        _windows.append(self)
+
+    def id(self):
+        return self._id
+
+    def folders(self):
+        return self._folders
+
+    def project_data(self):
+        return self._project_data
+
+    def set_project_data(self, data):
+        self._project_data = data
+
+    def project_file_name(self):
+        return None
+
+    def views(self):
+        return self._views
+
+    def active_view(self):
+        return self._views[0]
+
+    def active_group(self):
+        return 0
+
+    def transient_view_in_group(self, group):
+        return None
+
+    def new_file(self):
+        view = View(self)
+        self._views.append(view)
+        return view
+
+    def open_file(self, path, flags=0):
+        return self.new_file()
+
+    def focus_view(self, view):
+        pass
+
+    def create_output_panel(self, name, unlisted=False):
+        return self.get_output_panel(name)
+
+    def get_output_panel(self, name):
+        # Like the editor, the same view is returned emptied
+        if name not in self._panels:
+            self._panels[name] = View(self, name)
+        self._panels[name].clear()
+        return self._panels[name]
+
+    def find_output_panel(self, name):
+        return self._panels.get(name)
+
+    def show_quick_panel(self, items, on_done, flags=0, selected_index=-1, on_highlight=None):
+        stats["quick_panels"] += 1
+        self.quick_panels.append(items)
+
+    def show_input_panel(self, caption, initial_text, on_done, on_change, on_cancel):
+        pass
+
+    def run_command(self, name, args=None):
+        stats["window_command_%s" % name] += 1
+        import sublime_plugin
+        sublime_plugin.run_window_command(self, name, args or {})
+
+
+def windows():
+    return _windows
+
+
+def active_window():
+    if not _windows:
+        Window()
+    return _windows[-1]
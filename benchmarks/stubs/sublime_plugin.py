@@ -0,0 +1,55 @@
+"""
+Headless stand-in for the `sublime_plugin` module. Commands are looked up by class name,
+like the editor does (ViewInsertCommand runs as "view_insert").
+"""
+import re
+
+
+def command_name(cls):
+    name = re.sub(r"Command$", "", cls.__name__)
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def find_command(base, name):
+    pending = list(base.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        if command_name(cls) == name:
+            return cls
+        pending.extend(cls.__subclasses__())
+    return None
+
+
+class TextCommand(object):
+    def __init__(self, view):
+        self.view = view
+
+
+class WindowCommand(object):
+    def __init__(self, window):
+        self.window = window
+
+
+class ApplicationCommand(object):
+    pass
+
+
+class EventListener(object):
+    pass
+
+
+class ViewEventListener(object):
+    def __init__(self, view):
+        self.view = view
+
+
+def run_text_command(view, name, args):
+    cls = find_command(TextCommand, name)
+    if cls is not None:
+        cls(view).run(None, **args)
+
+
+def run_window_command(window, name, args):
+    cls = find_command(WindowCommand, name)
+    if cls is not None:
+        cls(window).run(**args)
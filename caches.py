@@ -1,19 +1,40 @@
 import sublime
 import json
 import codecs
+import gzip
 import os
+from threading import RLock, Timer, current_thread
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 is_sublime_text_3 = int(sublime.version()) >= 3000
 
 if is_sublime_text_3:
     from .settings import Settings
+    from .hasher import Hasher
 else:
     from settings import Settings
+    from hasher import Hasher
 
 
 class ProcessCache():
+    """
+    In memory registry of the running tasks. It's the source of truth, the storage is only used
+    to restore the processes on the next session so writes are batched (see FLUSH_DELAY)
+    """
+
+    FLUSH_DELAY = 0.5
+
     _procs = []
     last_task_name = None
+    lock = RLock()
+    flush_timer = None
+    # Incremented on every change of the process list, alongside a call to each listener
+    version = 0
+    listeners = {}
 
     @classmethod
     def get_from_storage(cls):
@@ -23,27 +44,23 @@ class ProcessCache():
     def get(cls):
         return cls._procs[:]
 
-    @classmethod
-    def refresh(cls):
-        def remove_dead(process):
-            if not process.is_alive():
-                cls.remove(process)
-        cls.each(remove_dead)
-
     @classmethod
     def add(cls, process):
-        cls.last_task_name = process.get_task_name()
-        if process not in cls._procs:
-            cls._procs.append(process)
-
-        process = process.to_json()
-        cls.storage().update(lambda procs: procs + [process] if process not in procs else procs)
+        with cls.lock:
+            cls.last_task_name = process.get_task_name()
+            if process not in cls._procs:
+                cls._procs.append(process)
+            cls.schedule_flush()
+        cls.changed()
 
     @classmethod
     def remove(cls, process):
-        if process in cls._procs:
+        with cls.lock:
+            if process not in cls._procs:
+                return
             cls._procs.remove(process)
-        cls.storage().update(lambda procs: [proc for proc in procs if proc['pid'] != process.pid])
+            cls.schedule_flush()
+        cls.changed()
 
     @classmethod
     def kill_all(cls):
@@ -61,17 +78,91 @@ class ProcessCache():
 
     @classmethod
     def clear(cls):
-        del cls._procs[:]
-        cls.storage().write([])
+        with cls.lock:
+            del cls._procs[:]
+            cls.schedule_flush()
+        cls.changed()
+
+    @classmethod
+    def add_on_change(cls, key, fn):
+        cls.listeners[key] = fn
+
+    @classmethod
+    def clear_on_change(cls, key):
+        cls.listeners.pop(key, None)
+
+    @classmethod
+    def changed(cls):
+        with cls.lock:
+            cls.version += 1
+        for fn in list(cls.listeners.values()):
+            fn()
+
+    @classmethod
+    def schedule_flush(cls):
+        if cls.flush_timer is None:
+            cls.flush_timer = Timer(cls.FLUSH_DELAY, cls.flush)
+            cls.flush_timer.daemon = True
+            cls.flush_timer.start()
+
+    @classmethod
+    def flush(cls):
+        with cls.lock:
+            if cls.flush_timer is not None:
+                cls.flush_timer.cancel()
+                cls.flush_timer = None
+            procs = [process.to_json() for process in cls._procs]
+
+        try:
+            cls.storage().write(procs)
+        except (IOError, OSError) as e:
+            print("%s: Could not save the running tasks. %s" % (Settings.PACKAGE_NAME, str(e)))
 
     @classmethod
     def storage(cls):
         if Settings.get_from_shared_data("track_processes", True):
-            return CacheFile(Settings.package_path())
+            return CacheFile(Settings.package_path(), shared=True)
         else:
             return Cache()
 
 
+class TaskCache():
+    """
+    In memory copy of the tasks of each gulpfile, alongside the rows shown on the quick panel.
+    An entry is valid while the cache file and every file used to build it keep the same stat fingerprint
+    """
+
+    _entries = {}
+
+    @classmethod
+    def get(cls, gulpfile):
+        entry = cls._entries.get(gulpfile)
+        if entry is not None and entry["stamps"] == cls.stamps(entry["paths"]):
+            return entry
+        return None
+
+    @classmethod
+    def set(cls, gulpfile, cache_path, gulpfile_data, rows):
+        paths = [cache_path, gulpfile] + list(gulpfile_data.get("files", {}).keys()) + list(gulpfile_data.get("folders", {}).keys())
+        cls._entries[gulpfile] = {
+            "tasks": gulpfile_data["tasks"],
+            "rows": rows,
+            "paths": paths,
+            "stamps": cls.stamps(paths)
+        }
+
+    @classmethod
+    def remove(cls, gulpfile):
+        cls._entries.pop(gulpfile, None)
+
+    @classmethod
+    def stamps(cls, paths):
+        try:
+            return [Hasher.stat_fingerprint(path) for path in paths]
+        except (IOError, OSError):
+            return None
+
+
 class Cache():
     def exists(self):
         pass
@@ -93,9 +184,11 @@ class Cache():
 
 
 class CacheFile(Cache):
-    def __init__(self, working_dir):
+    def __init__(self, working_dir, file_name=Settings.CACHE_FILE_NAME, shared=False):
         self.working_dir = working_dir
-        self.cache_path = os.path.join(self.working_dir, Settings.CACHE_FILE_NAME)
+        self.cache_path = os.path.join(self.working_dir, file_name)
+        # Files written by more than one editor instance (on the package folder) are locked while writing
+        self.shared = shared
 
     def exists(self):
         return os.path.exists(self.cache_path)
@@ -120,32 +213,97 @@ class CacheFile(Cache):
         return data
 
     def write(self, data):
-        cache_file = self.open("w")
+        with self.locked():
+            self.write_unlocked(data)
 
-        try:
-            json_data = json.dumps(data, ensure_ascii=False)
+    def write_unlocked(self, data):
+        json_data = json.dumps(data, ensure_ascii=False)
+
+        if not json_data:
+            json_data = '[]'
 
-            if not json_data:
-                json_data = '[]'
+        # Written to a temporary file and moved into place, so readers never see half a file
+        tmp_path = self.tmp_path()
 
-            cache_file.write(json_data)
+        tmp_file = codecs.open(tmp_path, "w", "utf-8", errors='replace')
+        try:
+            tmp_file.write(json_data)
         finally:
-            cache_file.close()
+            tmp_file.close()
+        self.replace(tmp_path)
+
+    def tmp_path(self):
+        # The plugin threads share the pid, each writer gets its own file
+        return "%s.%d.%d.tmp" % (self.cache_path, os.getpid(), current_thread().ident)
+
+    def replace(self, tmp_path):
+        if hasattr(os, 'replace'):
+            os.replace(tmp_path, self.cache_path)
+        else:
+            if os.name == 'nt' and os.path.exists(self.cache_path):
+                os.remove(self.cache_path)
+            os.rename(tmp_path, self.cache_path)
+
+    def locked(self):
+        return FileLock(self.cache_path + ".lock" if self.shared else None)
 
     def update(self, fn):
-        cache_file = codecs.open(self.cache_path, "r+", "utf-8", errors='replace')
-        current_data = None
+        """ Writes fn(current data), unless the current data can't be read: a default would wipe the cache """
+        with self.locked():
+            cache_file = self.open()
+            try:
+                current_data = json.load(cache_file)
+            except ValueError:
+                return
+            finally:
+                cache_file.close()
 
-        try:
-            current_data = json.load(cache_file)
-        except ValueError:
-            current_data = []
+            self.write_unlocked(fn(current_data))
 
-        try:
-            cache_file.seek(0)
 
-            new_data = fn(current_data)
-            cache_file.write(json.dumps(new_data))
-            cache_file.truncate()
+class CompressedCacheFile(CacheFile):
+    """ A CacheFile stored gzipped, for big responses like the plugin registry one """
+
+    def read(self):
+        gzip_file = gzip.open(self.cache_path, "rb")
+        try:
+            return json.loads(gzip_file.read().decode("utf-8"))
+        except (ValueError, IOError, EOFError):
+            return None
         finally:
-            cache_file.close()
+            gzip_file.close()
+
+    def write(self, data):
+        json_data = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        tmp_path = self.tmp_path()
+
+        with self.locked():
+            gzip_file = gzip.open(tmp_path, "wb")
+            try:
+                gzip_file.write(json_data)
+            finally:
+                gzip_file.close()
+            self.replace(tmp_path)
+
+
+class FileLock():
+    """
+    Advisory lock serializing the writers of a cache file, between editor instances too.
+    Only available where fcntl is (not on Windows), elsewhere (or without a lock_path) it does nothing.
+    """
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self.lock_file = None
+
+    def __enter__(self):
+        if fcntl is not None and self.lock_path is not None:
+            self.lock_file = open(self.lock_path, "a")
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        if self.lock_file is not None:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
@@ -1,7 +1,11 @@
 import sublime
+import codecs
 import sys
 import re
 
+# CSI sequences (colors, cursor movement), OSC sequences (titles, links) and the remaining two byte escapes
+ANSI_ESCAPE_RE = re.compile(r'\033(?:\[[0-?]*[ -/]*[@-~]|\][^\007\033]*(?:\007|\033\\)|[@-Z\\-_])')
+
 
 class CrossPlatformCodecs():
     @classmethod
@@ -9,7 +13,7 @@ class CrossPlatformCodecs():
         line = line.rstrip()
         decoded_line = self.force_decode(line) if sys.version_info >= (3, 0) else line
         decoded_line = decoded_line.lstrip('\n\r')
-        decoded_line = re.sub(r'\033\[(\d{1,2}m|\d\w)', '', str(decoded_line))
+        decoded_line = ANSI_ESCAPE_RE.sub('', str(decoded_line))
         return decoded_line + "\n"
 
     @classmethod
@@ -23,6 +27,10 @@ class CrossPlatformCodecs():
 
     @classmethod
     def decode_windows_line(self, text):
+        return text.decode(self.windows_codepage())
+
+    @classmethod
+    def windows_codepage(self):
         # Import only for Windows
         import locale
         import subprocess
@@ -35,12 +43,52 @@ class CrossPlatformCodecs():
         chcp = chcp.decode(locale.getpreferredencoding()).strip(".\r\n ")
 
         # Get the actual number
-        chcp = chcp.split(" ")[-1]
-
-        # Actually decode
-        return text.decode("cp" + chcp)
+        return "cp" + chcp.split(" ")[-1]
 
     @classmethod
     def encode_process_command(self, command):
         is_sublime_2_and_in_windows = sublime.platform() == "windows" and int(sublime.version()) < 3000
         return command.encode(sys.getfilesystemencoding()) if is_sublime_2_and_in_windows else command
+
+
+class LineDecoder():
+    """
+    Decodes a stream fed in arbitrary binary chunks, returning the complete lines found so far.
+    Multibyte characters and escape sequences split between chunks are kept until the rest arrives.
+    Each line is cleaned up the same way CrossPlatformCodecs.decode_line does.
+    """
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.pending = ''
+
+    def feed(self, chunk):
+        text = self.pending + self.decode(chunk)
+        (complete, newline, self.pending) = text.rpartition('\n')
+        return self.split(complete) if newline else []
+
+    def flush(self):
+        text = self.pending + self.decode(b'', final=True)
+        self.pending = ''
+        return self.split(text) if text else []
+
+    def split(self, text):
+        text = ANSI_ESCAPE_RE.sub('', text)
+        return [line.rstrip().lstrip('\r') + '\n' for line in text.split('\n')]
+
+    def decode(self, chunk, final=False):
+        if sys.version_info < (3, 0):
+            return chunk
+
+        try:
+            return self.decoder.decode(chunk, final)
+        except UnicodeDecodeError:
+            self.use_fallback_decoder()
+            return self.decoder.decode(chunk, final)
+
+    def use_fallback_decoder(self):
+        if sublime.platform() == "windows":
+            encoding = CrossPlatformCodecs.windows_codepage()
+        else:
+            encoding = 'utf-8'
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
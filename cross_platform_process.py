@@ -10,32 +10,40 @@ is_sublime_text_3 = int(sublime.version()) >= 3000
 
 if is_sublime_text_3:
     from .settings import Settings
-    from .dir_context import Dir
-    from .cross_platform_codecs import CrossPlatformCodecs
+    from .cross_platform_codecs import CrossPlatformCodecs, LineDecoder
+    from .stream_capture import StreamCapture
+    from .io_loop import IOLoop
     from .caches import ProcessCache, CacheFile
 else:
     from settings import Settings
-    from dir_context import Dir
-    from cross_platform_codecs import CrossPlatformCodecs
+    from cross_platform_codecs import CrossPlatformCodecs, LineDecoder
+    from stream_capture import StreamCapture
+    from io_loop import IOLoop
     from caches import ProcessCache, CacheFile
 
 
 class CrossPlatformProcess():
-    def __init__(self, working_dir="", last_command="", pid=None):
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, working_dir="", last_command="", pid=None, start_time=None):
         self.working_dir = working_dir
         self.last_command = last_command
         self.pid = pid
+        # Stored alongside the pid to tell a restored task apart from an unrelated process that reused its pid
+        self.start_time = start_time
 
         self.nonblocking = Settings.get_from_shared_data("nonblocking", True)
+        self.chunked = Settings.get_from_shared_data("chunked_output_reader", False)
         self.path = Env.get_path(Settings.get_from_shared_data('exec_args', False))
 
         self.process = None
         self.failed = False
 
     def run(self, command):
-        with Dir.cd(self.working_dir):
-            self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self.path, shell=True, preexec_fn=self._preexec_val())
-            self.pid = self.process.pid
+        # cwd is set per process, changing the directory of the whole plugin host would race with other threads
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self.path, shell=True, cwd=self.cwd(), preexec_fn=self._preexec_val())
+        self.pid = self.process.pid
+        self.start_time = self._read_start_time()
 
         self.last_command = command.rstrip()
         ProcessCache.add(self)
@@ -44,14 +52,16 @@ class CrossPlatformProcess():
     def run_sync(self, command):
         command = CrossPlatformCodecs.encode_process_command(command)
 
-        with Dir.cd(self.working_dir):
-            self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self.path, shell=True)
-            self.pid = self.process.pid
-            (stdout, stderr) = self.process.communicate()
-            self.failed = self.process.returncode == 127 or stderr
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self.path, shell=True, cwd=self.cwd())
+        self.pid = self.process.pid
+        (stdout, stderr) = self.process.communicate()
+        self.failed = self.process.returncode == 127 or stderr
 
         return (CrossPlatformCodecs.force_decode(stdout), CrossPlatformCodecs.force_decode(stderr))
 
+    def cwd(self):
+        return self.working_dir or None
+
     def _preexec_val(self):
         return os.setsid if sublime.platform() != "windows" else None
 
@@ -61,6 +71,13 @@ class CrossPlatformProcess():
         self.terminate()
         return (stdout, stderr)
 
+    def uses_io_loop(self):
+        return self.nonblocking == "selector" and IOLoop.available()
+
+    def communicate_in_io_loop(self, fn, on_finish):
+        # Returns immediately, `on_finish` is called with (stdout, stderr) from the loop thread once the process exits
+        IOLoop.add(self, fn, on_finish)
+
     def pipe(self, fn):
         streams = [self.process.stdout, self.process.stderr]
         streams_text = []
@@ -73,21 +90,53 @@ class CrossPlatformProcess():
         return streams_text
 
     def _pipe_stream(self, stream, fn):
-        output_text = ""
+        capture = self.new_capture()
+        for output_line in self._read_lines(stream):
+            capture.append(output_line)
+            fn(output_line)
+        capture.close()
+        return capture
+
+    def _read_lines(self, stream):
+        if self.chunked:
+            return self._read_chunked_lines(stream)
+        else:
+            return self._read_buffered_lines(stream)
+
+    def _read_buffered_lines(self, stream):
         while True:
             line = stream.readline()
             if not line:
                 break
-            output_line = CrossPlatformCodecs.decode_line(line)
-            output_text += output_line
-            fn(output_line)
-        return output_text
+            yield CrossPlatformCodecs.decode_line(line)
+
+    def _read_chunked_lines(self, stream):
+        decoder = LineDecoder()
+        fd = stream.fileno()
+        while True:
+            chunk = os.read(fd, self.CHUNK_SIZE)
+            if not chunk:
+                break
+            for line in decoder.feed(chunk):
+                yield line
+        for line in decoder.flush():
+            yield line
+
+    def new_capture(self):
+        return StreamCapture(
+            max_lines=Settings.get_from_shared_data("output_capture_max_lines", 1000),
+            max_bytes=Settings.get_from_shared_data("output_capture_max_bytes", 256 * 1024),
+            spill_to_file=Settings.get_from_shared_data("output_capture_spill_to_file", False)
+        )
 
     def terminate(self):
         if self.is_alive():
             self.process.terminate()
         ProcessCache.remove(self)
 
+    def is_child(self):
+        return self.process is not None
+
     def is_alive(self):
         if (self.process is not None and self.pid is not None):
             return self.process.poll() is None
@@ -98,6 +147,9 @@ class CrossPlatformProcess():
         if not self.pid:
             return False
 
+        if self.start_time is not None and os.path.isdir("/proc/self"):
+            return self._read_start_time() == self.start_time
+
         if sublime.platform() == "windows":
             taskkill = subprocess.Popen(['C:\\Windows\\system32\\tasklist.exe', '/FI', 'PID eq %s' % self.pid, '/FO', 'CSV'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
             (stdout, stderr) = taskkill.communicate()
@@ -119,6 +171,20 @@ class CrossPlatformProcess():
             else:
                 return True
 
+    def _read_start_time(self):
+        """ Start time of the process in clock ticks since boot, None if it doesn't exist or /proc isn't available """
+        try:
+            with open("/proc/%d/stat" % self.pid) as stat_file:
+                stat = stat_file.read()
+        except (IOError, OSError):
+            return None
+
+        # The command name (2nd field) can contain spaces, so fields are counted from its closing parenthesis
+        try:
+            return int(stat[stat.rindex(")") + 2:].split()[19])
+        except (ValueError, IndexError):
+            return None
+
     def returncode(self):
         return self.process.returncode
 
@@ -137,7 +203,8 @@ class CrossPlatformProcess():
         return {
             'last_command': self.last_command,
             'working_dir': self.working_dir,
-            'pid': self.pid
+            'pid': self.pid,
+            'start_time': self.start_time
         }
 
     def to_tuple(self):
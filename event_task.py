@@ -1,14 +1,18 @@
 import sublime
 import sublime_plugin
-import os
-from fnmatch import fnmatch
 
 is_sublime_text_3 = int(sublime.version()) >= 3000
 
 if is_sublime_text_3:
     from .settings import Settings
+    from .tasks_on_save import TasksOnSave
+    from .output_archive import OutputArchive
+    from .prewarm import Prewarm
 else:
     from settings import Settings
+    from tasks_on_save import TasksOnSave
+    from output_archive import OutputArchive
+    from prewarm import Prewarm
 
 
 class EventTask(sublime_plugin.EventListener):
@@ -22,33 +26,38 @@ class EventTask(sublime_plugin.EventListener):
 
     def on_activated(self, view):
         view.run_command("gulp_update_status_bar")
+        self.prewarm(view.window())
+
+    # Sublime Text 4 only, on_activated covers older versions
+    def on_new_window(self, window):
+        self.prewarm(window)
+
+    def on_load_project(self, window):
+        Settings.invalidate(window)
+        self.prewarm(window)
+
+    def on_post_save_project(self, window):
+        Settings.invalidate(window)
+
+    def on_pre_close_window(self, window):
+        Settings.invalidate(window)
+
+    def prewarm(self, window):
+        # on_activated runs on every tab switch, so nothing else is done while prewarming is off
+        if not window or not Settings.snapshot(window).get("prewarm_task_cache", False):
+            return
+
+        if Prewarm.pending(window):
+            window.run_command("gulp_prewarm")
+
+    def on_close(self, view):
+        OutputArchive.discard(view)
 
     def on_post_save(self, view):
-        settings = Settings()
-        self.view = view
-        self.run_kill = settings.get('kill_before_save_tasks', False)
-        self.run_tasks(settings.get("tasks_on_save", {}))
-        self.run_tasks(settings.get("silent_tasks_on_save", {}), silent=True)
-
-        self.view.run_command("gulp_update_status_bar")
-
-    def run_tasks(self, tasks_on_save, silent=False):
-        if tasks_on_save:
-            for key in tasks_on_save:
-                value = tasks_on_save[key]
-                if isinstance(value, list):
-                    for pattern in value:
-                        self.run(key, pattern, silent)
-                else:
-                    self.run(key, value, silent)
-
-    def run(self, task, pattern, silent):
-        folders = self.view.window().folders() or []
-        if any(fnmatch(self.view.file_name(), os.path.join(folder, pattern)) for folder in folders):
-            self.kill_once()
-            self.view.window().run_command("gulp", { "task_name": task, "silent": silent })
-
-    def kill_once(self):
-        if self.run_kill:
-            self.view.window().run_command("gulp_kill", { "silent": True })
-            self.run_kill = False
+        window = view.window()
+        if window and view.file_name():
+            if view.file_name().endswith(".sublime-project"):
+                Settings.invalidate(window)
+            TasksOnSave.for_window(window, Settings(window)).saved(view.file_name())
+
+        view.run_command("gulp_update_status_bar")
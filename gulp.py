@@ -2,10 +2,11 @@ import sublime
 import sublime_plugin
 import traceback
 import codecs
+import copy
 import os
+import time
 from datetime import datetime
 from threading import Thread
-import json
 import webbrowser
 
 is_sublime_text_3 = int(sublime.version()) >= 3000
@@ -17,10 +18,21 @@ if is_sublime_text_3:
     from .cross_platform_process import CrossPlatformProcess
     from .hasher import Hasher
     from .gulp_version import GulpVersion
-    from .plugins import PluginList, PluginRegistryCall
-    from .caches import ProcessCache, CacheFile
+    from .plugins import PluginRegistry, installed_packages
+    from .caches import ProcessCache, CacheFile, TaskCache
+    from .node_worker import NodeWorker
+    from .gulpfile_index import GulpfileIndex
+    from .gulpfile_walker import GulpfileWalker
+    from .prewarm import Prewarm
     from .status_bar import StatusBar
-    from .timeout import set_timeout, defer, defer_sync, async
+    from .process_reaper import ProcessReaper
+    from .process_metrics import ProcessMetrics
+    from .task_run import TaskRun
+    from .task_history import TaskHistory, format_duration
+    from .task_timeline import TaskTimeline
+    from .output_archive import OutputArchive
+    from .stream_capture import StreamCapture
+    from .timeout import defer, defer_sync, run_async
 else:
     from base_command import BaseCommand
     from settings import Settings
@@ -28,10 +40,21 @@ else:
     from cross_platform_process import CrossPlatformProcess
     from hasher import Hasher
     from gulp_version import GulpVersion
-    from plugins import PluginList, PluginRegistryCall
-    from caches import ProcessCache, CacheFile
+    from plugins import PluginRegistry, installed_packages
+    from caches import ProcessCache, CacheFile, TaskCache
+    from node_worker import NodeWorker
+    from gulpfile_index import GulpfileIndex
+    from gulpfile_walker import GulpfileWalker
+    from prewarm import Prewarm
     from status_bar import StatusBar
-    from timeout import set_timeout, defer, defer_sync, async
+    from process_reaper import ProcessReaper
+    from process_metrics import ProcessMetrics
+    from task_run import TaskRun
+    from task_history import TaskHistory, format_duration
+    from task_timeline import TaskTimeline
+    from output_archive import OutputArchive
+    from stream_capture import StreamCapture
+    from timeout import defer, defer_sync, run_async
 
 
 #
@@ -43,13 +66,20 @@ class GulpCommand(BaseCommand):
     log_file_name = 'sublime-gulp.log'
     allowed_extensions = [".babel.js", ".js"]
 
+    def run(self, gulpfile=None, **kwargs):
+        # `gulpfile` skips the search, used to run tasks from a known gulpfile (see GulpRunMultipleCommand)
+        self.gulpfile = gulpfile
+        BaseCommand.run(self, **kwargs)
+
     def work(self):
-        self.folders = []
-        self.gulp_files = []
-        self.list_gulp_files()
+        if self.gulpfile:
+            self.gulp_files = [self.gulpfile]
+            self.show_tasks_from_gulp_file(0)
+        else:
+            self.list_gulp_files()
 
     def list_gulp_files(self):
-        self.append_paths()
+        self.find_gulp_files()
 
         if not self.check_for_gulpfile:
             self.gulp_files = self.folders
@@ -62,15 +92,29 @@ class GulpCommand(BaseCommand):
                 sufix += '\n\nCheck the recursive_gulpfile_search setting for nested gulpfiles'
             self.error_message("gulpfile not found %s" % sufix)
 
+    def find_gulp_files(self):
+        self.folders = []
+        self.gulp_files = []
+        self.gulp_files_set = set()
+        self.append_paths()
+
     def append_paths(self):
         gulpfile_paths = self.settings.get("gulpfile_paths", [])
         ignored_gulpfile_folders = self.settings.get("ignored_gulpfile_folders", [])
 
         if self.settings.get("recursive_gulpfile_search", False):
+            walker = GulpfileWalker(
+                gulpfile_names=["gulpfile" + extension for extension in GulpCommand.allowed_extensions],
+                ignored_folders=ignored_gulpfile_folders,
+                use_gitignore=self.settings.get("gulpfile_search_gitignore", True),
+                max_depth=self.settings.get("gulpfile_search_max_depth", 0),
+                threads=self.settings.get("gulpfile_search_threads", 4)
+            )
             for folder_path in self.searchable_folders:
-                for dir, dirnames, files in os.walk(folder_path):
-                    dirnames[:] = [dirname for dirname in dirnames if dirname not in ignored_gulpfile_folders]
-                    self.append_to_gulp_files(dir)
+                (dirs, gulp_files) = GulpfileIndex.find(folder_path, walker)
+                self.folders.extend(dirs)
+                for gulpfile_path in gulp_files:
+                    self.add_gulp_file(gulpfile_path)
         else:
             for folder_path in self.searchable_folders:
                 self.append_to_gulp_files(folder_path)
@@ -82,7 +126,12 @@ class GulpCommand(BaseCommand):
     def append_to_gulp_files(self, folder_path):
         gulpfile_path = self.get_gulpfile_path(folder_path)
         self.folders.append(folder_path)
-        if os.path.exists(gulpfile_path) and gulpfile_path not in self.gulp_files:
+        if os.path.exists(gulpfile_path):
+            self.add_gulp_file(gulpfile_path)
+
+    def add_gulp_file(self, gulpfile_path):
+        if gulpfile_path not in self.gulp_files_set:
+            self.gulp_files_set.add(gulpfile_path)
             self.gulp_files.append(gulpfile_path)
 
     def choose_file(self):
@@ -105,17 +154,24 @@ class GulpCommand(BaseCommand):
             self.show_quick_panel(self.tasks, self.task_list_callback)
 
     def list_tasks(self):
+        gulpfile = self.get_gulpfile_path(self.working_dir)
+        cached = TaskCache.get(gulpfile)
+        if cached is not None:
+            return cached["rows"]
+
         try:
             self.callcount = 0
-            json_result = self.fetch_json()
+            gulpfile_data = self.fetch_json()
         except TypeError as e:
             self.error_message("Could not read available tasks.\nMaybe the JSON cache (.sublime-gulp.cache) is malformed?")
         except Exception as e:
             print(traceback.format_exc())
             self.error_message(str(e))
         else:
-            tasks = [[name, self.dependencies_text(task)] for name, task in json_result.items()]
-            return sorted(tasks, key=lambda task: task)
+            tasks = [[name, self.dependencies_text(task)] for name, task in gulpfile_data["tasks"].items()]
+            tasks = sorted(tasks, key=lambda task: task)
+            TaskCache.set(gulpfile, CacheFile(self.working_dir).cache_path, gulpfile_data, tasks)
+            return tasks
 
     def dependencies_text(self, task):
         return "Dependencies: " + task['dependencies'] if task['dependencies'] else ""
@@ -126,11 +182,15 @@ class GulpCommand(BaseCommand):
         data = None
 
         if cache_file.exists():
-            filesha1 = Hasher.sha1(gulpfile)
             data = cache_file.read()
+            self.restore_fingerprints(gulpfile, data)
+            filesha1 = Hasher.sha1(gulpfile)
 
             if gulpfile in data and data[gulpfile]["sha1"] == filesha1:
-                return data[gulpfile]["tasks"]
+                # Trust a cache that was just written even if a loaded file changed in the meantime
+                if self.callcount > 0 or self.loaded_files_match(data[gulpfile]):
+                    self.store_fingerprints(cache_file, gulpfile, data[gulpfile])
+                    return data[gulpfile]
 
         self.callcount += 1
 
@@ -145,7 +205,47 @@ class GulpCommand(BaseCommand):
         else:
             raise Exception("Have you renamed a folder?.\nSometimes Sublime doesn't update the project path, try removing the folder from the project and adding it again.")
 
+    def restore_fingerprints(self, gulpfile, data):
+        # The fingerprints stored on the cache let Hasher skip reading the files after a restart
+        if isinstance(data, dict) and gulpfile in data:
+            gulpfile_data = data[gulpfile]
+            fingerprints = gulpfile_data.get("fingerprints", {})
+            hashes = dict(gulpfile_data.get("files", {}))
+            hashes[gulpfile] = gulpfile_data["sha1"]
+
+            for (path, fingerprint) in fingerprints.items():
+                if path in hashes:
+                    Hasher.seed(path, fingerprint, hashes[path])
+
+    def store_fingerprints(self, cache_file, gulpfile, gulpfile_data):
+        paths = [gulpfile] + list(gulpfile_data.get("files", {}).keys())
+        fingerprints = dict((path, Hasher.memoized_fingerprint(path)) for path in paths if Hasher.memoized_fingerprint(path))
+
+        if fingerprints != gulpfile_data.get("fingerprints"):
+            gulpfile_data["fingerprints"] = fingerprints
+
+            def add_fingerprints(data):
+                if gulpfile in data and data[gulpfile]["sha1"] == gulpfile_data["sha1"]:
+                    data[gulpfile]["fingerprints"] = fingerprints
+                return data
+
+            try:
+                cache_file.update(add_fingerprints)
+            except (IOError, OSError) as e:
+                print("%s: Could not store the gulpfile fingerprints. %s" % (Settings.PACKAGE_NAME, str(e)))
+
+    def loaded_files_match(self, gulpfile_data):
+        try:
+            files_match = all(Hasher.sha1(path) == sha1 for (path, sha1) in gulpfile_data.get("files", {}).items())
+            folders_match = all(Hasher.listing_sha1(path) == sha1 for (path, sha1) in gulpfile_data.get("folders", {}).items())
+            return files_match and folders_match
+        except (IOError, OSError):
+            return False
+
     def write_to_cache(self):
+        if self.settings.get("node_worker", False) and self.write_to_cache_with_worker():
+            return self.fetch_json()
+
         process = CrossPlatformProcess(self.working_dir)
         (stdout, stderr) = process.run_sync(r'node "%s/write_tasks_to_cache.js"' % self.settings.package_path())
 
@@ -161,6 +261,15 @@ class GulpCommand(BaseCommand):
 
         return self.fetch_json()
 
+    def write_to_cache_with_worker(self):
+        try:
+            NodeWorker.write_tasks_to_cache(self.working_dir, self.settings.get("node_worker_idle_timeout_in_seconds", 300))
+            return True
+        except Exception as e:
+            # Let the regular node call report the error
+            print("%s: node worker failed, falling back to node. %s" % (Settings.PACKAGE_NAME, str(e)))
+            return False
+
     def write_to_cache_without_js(self):
         process = CrossPlatformProcess(self.working_dir)
         (stdout, stderr) = process.run_sync(r'gulp -v')
@@ -206,36 +315,71 @@ class GulpCommand(BaseCommand):
             self.run_gulp_task()
 
     def run_gulp_task(self):
-        task = self.construct_gulp_task()
-        Thread(target=self.run_process, args=(task, )).start()
-
-    def construct_gulp_task(self):
+        task_run = TaskRun(self.working_dir, self.task_name, self.task_flag, self.silent, self.get_gulpfile_path(self.working_dir))
         self.show_running_status_in_output_panel()
-        return r"gulp %s %s" % (self.task_name, self.task_flag)
+        Thread(target=self.run_process, args=(task_run, )).start()
 
-    def run_process(self, task):
-        process = CrossPlatformProcess(self.working_dir)
-        process.run(task)
-        self.status_bar.update()
-        stdout, stderr = process.communicate(self.append_to_output_view_in_main_thread)
-        defer_sync(lambda: self.finish(stdout, stderr))
+    def run_process(self, task_run):
+        process = CrossPlatformProcess(task_run.working_dir)
+        process.run(task_run.command())
+        task_run.start(process)
+
+        on_output = self.ignore_output if task_run.silent else self.append_to_output_view_in_main_thread
+        on_output = self.with_timeline(task_run.timeline, on_output)
+        on_finish = lambda stdout, stderr: self.finish_in_main_thread(task_run, stdout, stderr)
+
+        if process.uses_io_loop():
+            process.communicate_in_io_loop(on_output, on_finish)
+        else:
+            stdout, stderr = process.communicate(on_output)
+            on_finish(stdout, stderr)
+
+    def ignore_output(self, text):
+        pass
 
-    def finish(self, stdout, stderr):
-        finish_message = "gulp %s %s finished %s" % (self.task_name or '', self.task_flag, "with some errors." if stderr else "!")
+    def with_timeline(self, timeline, fn):
+        def on_output(text):
+            timeline.feed(text)
+            fn(text)
+        return on_output
+
+    def finish_in_main_thread(self, task_run, stdout, stderr):
+        defer_sync(lambda: self.finish(task_run, stdout, stderr))
+
+    def finish(self, task_run, stdout, stderr):
+        self.flush_output_view()
+        task_run.finish()
+        finish_message = "gulp %s %s finished %s %s" % (task_run.task_name or '', task_run.task_flag, "with some errors." if stderr else "!", self.timing_message(task_run))
         self.status_message(finish_message)
-        self.status_bar.update()
-        if not self.silent:
+        if not task_run.silent:
             self.set_output_close_on_timeout()
         elif stderr and self.settings.get("show_silent_errors", False):
+            silent = self.silent
             self.silent = False
-            self.show_running_status_in_output_panel()
-            self.append_to_output_view(stdout)
-            self.append_to_output_view(stderr)
-            self.silent = True
+            self.show_running_status_in_output_panel(task_run.task_name, task_run.task_flag)
+            self.append_to_output_view(stdout.text())
+            self.append_to_output_view(stderr.text())
+            self.silent = silent
+            # The spill files are named on the panel, they're kept until the plugin is unloaded
+            return
+
+        stdout.discard()
+        stderr.discard()
+
+    def timing_message(self, task_run):
+        timings = TaskHistory.record(task_run)
+        message = "(%s" % format_duration(task_run.duration())
+
+        slower = timings.regression(self.settings.get("task_timings_regression_threshold_percent", 20))
+        if slower is not None:
+            message += ", %d%% slower than usual" % slower
+        return message + ")"
 
-    def show_running_status_in_output_panel(self):
-        with_flag_text = (' with %s' % self.task_flag) if self.task_flag else ''
-        self.show_output_panel("Running '%s'%s...\n" % (self.task_name, with_flag_text))
+    def show_running_status_in_output_panel(self, task_name=None, task_flag=None):
+        task_name = task_name or self.task_name
+        task_flag = self.task_flag if task_flag is None else task_flag
+        with_flag_text = (' with %s' % task_flag) if task_flag else ''
+        self.show_output_panel("Running '%s'%s...\n" % (task_name, with_flag_text))
 
 
 class GulpArbitraryCommand(GulpCommand):
@@ -251,6 +395,91 @@ class GulpArbitraryCommand(GulpCommand):
             self.run_gulp_task()
 
 
+class GulpPrewarmCommand(GulpCommand):
+    """
+    Builds the task cache of every gulpfile on the window folders in the background,
+    so the first task list of the session doesn't have to wait for it
+    """
+
+    START_DELAY = 2
+
+    def work(self):
+        if not self.settings.get("prewarm_task_cache", False) or not self.searchable_folders:
+            return
+
+        if Prewarm.claim(self.window):
+            # Sublime keeps one command per window, so the thread works on its own copy
+            # to keep the gulpfile it's on (working_dir, gulp_files, callcount) from other runs
+            thread = Thread(target=copy.copy(self).prewarm)
+            thread.daemon = True
+            thread.start()
+
+    def prewarm(self):
+        try:
+            # Let the editor finish loading first
+            time.sleep(GulpPrewarmCommand.START_DELAY)
+
+            self.check_for_gulpfile = True
+            self.find_gulp_files()
+
+            for gulp_file in self.gulp_files:
+                self.working_dir = gulp_file
+                self.list_tasks()
+        finally:
+            Prewarm.release(self.window)
+
+    def error_message(self, text):
+        print("%s: Could not prewarm the tasks of %s. %s" % (Settings.PACKAGE_NAME, self.working_dir, text))
+
+
+class GulpRescanGulpfilesCommand(GulpCommand):
+    def work(self):
+        defer(self.rescan)
+
+    def rescan(self):
+        GulpfileIndex.forget(self.searchable_folders)
+        self.find_gulp_files()
+        self.status_message("%d gulpfile(s) found" % len(self.gulp_files))
+
+
+class GulpRunMultipleCommand(GulpCommand):
+    def choose_file(self):
+        defer(self.list_all_tasks)
+
+    def list_all_tasks(self):
+        self.candidates = []
+        self.selected = set()
+
+        for gulp_file in self.gulp_files:
+            self.working_dir = gulp_file
+            for (task_name, dependencies) in self.list_tasks() or []:
+                self.candidates.append((gulp_file, task_name))
+
+        if self.candidates:
+            self.show_candidates()
+
+    def show_candidates(self, selected_index=0):
+        items = [["Run %d selected task(s)" % len(self.selected), "Pick the tasks to run below"]]
+        for (index, (gulp_file, task_name)) in enumerate(self.candidates):
+            mark = "[x]" if index in self.selected else "[ ]"
+            items.append(["%s %s" % (mark, task_name), gulp_file])
+        self.show_quick_panel(items, self.toggle_or_run, selected_index=selected_index)
+
+    def toggle_or_run(self, index):
+        if index == 0:
+            self.run_selected()
+        elif index > 0:
+            self.selected.symmetric_difference_update([index - 1])
+            self.show_candidates(index)
+
+    def run_selected(self):
+        # Each one is started on its own thread, in its own working directory.
+        # The output panel is started over by the first one, the rest write after it
+        for (position, index) in enumerate(sorted(self.selected)):
+            (gulp_file, task_name) = self.candidates[index]
+            self.window.run_command("gulp", { "task_name": task_name, "gulpfile": gulp_file, "silent": self.silent, "append_output": position > 0 })
+
+
 class GulpLastCommand(BaseCommand):
     def work(self):
         if ProcessCache.last_task_name:
@@ -262,15 +491,20 @@ class GulpLastCommand(BaseCommand):
 
 class GulpKillTaskCommand(BaseCommand):
     def work(self):
-        ProcessCache.refresh()
-
         if ProcessCache.empty():
             self.status_message("There are no running tasks")
         else:
             self.procs = ProcessCache.get()
-            quick_panel_list = [[process.last_command, process.working_dir, 'PID: %d' % process.pid] for process in self.procs]
+            quick_panel_list = [[process.last_command, process.working_dir, self.process_details(process)] for process in self.procs]
             self.show_quick_panel(quick_panel_list, self.kill_process, font=0)
 
+    def process_details(self, process):
+        details = 'PID: %d' % process.pid
+        usage = ProcessMetrics.get(process)
+        if usage is not None:
+            details += ' | CPU: %s | RSS: %s' % (usage.cpu_text(), usage.rss_text())
+        return details
+
     def kill_process(self, index=-1):
         if index >= 0 and index < len(self.procs):
             process = self.procs[index]
@@ -285,8 +519,6 @@ class GulpKillTaskCommand(BaseCommand):
 
 class GulpKillCommand(BaseCommand):
     def work(self):
-        ProcessCache.refresh()
-
         if ProcessCache.empty():
             self.status_message("There are no running tasks")
         else:
@@ -310,40 +542,69 @@ class GulpHidePanelCommand(BaseCommand):
 
 
 class GulpPluginsCommand(BaseCommand):
+    def run(self, search=False, query=None, **kwargs):
+        # `search` asks for a query first, `query` filters the list right away
+        self.search = search
+        self.query = query
+        BaseCommand.run(self, **kwargs)
+
     def work(self):
         self.plugins = None
-        self.request_plugin_list()
+        self.shown = []
+        url = self.settings.get("plugin_registry_url", PluginRegistry.URL) or PluginRegistry.URL
+        plugins = PluginRegistry.cached(url)
+
+        if plugins is not None:
+            self.show_plugins(plugins)
+            if PluginRegistry.is_stale(self.settings.get("plugins_cache_ttl_in_hours", 24)):
+                PluginRegistry.refresh(url)
+        else:
+            self.request_plugin_list(url)
 
-    def request_plugin_list(self):
+    def request_plugin_list(self, url):
         progress = ProgressNotifier("%s: Working" % Settings.PACKAGE_NAME)
-        thread = PluginRegistryCall()
-        thread.start()
-        self.handle_thread(thread, progress)
+        PluginRegistry.refresh(url, lambda plugins, error: defer_sync(lambda: self.handle_response(progress, plugins, error)))
 
-    def handle_thread(self, thread, progress):
-        if thread.is_alive() and not thread.error:
-            set_timeout(lambda: self.handle_thread(thread, progress), 100)
+    def handle_response(self, progress, plugins, error):
+        progress.stop()
+        if plugins is not None:
+            self.show_plugins(plugins)
         else:
-            progress.stop()
-            if thread.result:
-                plugin_response = json.loads(thread.result.decode('utf-8'))
-                self.plugins = PluginList(plugin_response)
-                self.show_quick_panel(self.plugins.quick_panel_list(), self.open_in_browser, font=0)
-            else:
-                self.error_message(self.error_text_for(thread))
+            self.error_message(self.error_text_for(error))
+
+    def show_plugins(self, plugins):
+        self.plugins = plugins
+        if self.query is not None:
+            self.show_matching_plugins(self.query)
+        elif self.search:
+            self.show_input_panel("Search gulp plugins:", "", self.show_matching_plugins)
+        else:
+            self.show_plugin_list(self.plugins.plugins)
+
+    def show_matching_plugins(self, query):
+        plugins = self.plugins.search(query)
+        if plugins:
+            self.show_plugin_list(plugins)
+        else:
+            self.status_message("No plugin matches '%s'" % query)
+
+    def show_plugin_list(self, plugins):
+        self.shown = plugins
+        installed = installed_packages(self.window.folders())
+        self.show_quick_panel(self.plugins.quick_panel_list(plugins, installed), self.open_in_browser, font=0)
 
-    def error_text_for(self, thread):
+    def error_text_for(self, error):
         error_tuple = (
             "The plugin repository seems to be down.",
             "If http://gulpjs.com/plugins is working, please report this issue at the Sublime Gulp repo (https://github.com/nicosantangelo/sublime-gulp).",
             "Thanks!",
-            thread.error
+            error
         )
         return "\n\n%s\n\n%s\n\n%s\n\n%s" % error_tuple
 
     def open_in_browser(self, index=-1):
-        if index >= 0 and index < self.plugins.length:
-            webbrowser.open_new(self.plugins.get(index).get('homepage'))
+        if index >= 0 and index < len(self.shown):
+            webbrowser.open_new(self.shown[index].homepage)
 
 
 class GulpDeleteCacheCommand(GulpCommand):
@@ -358,6 +619,7 @@ class GulpDeleteCacheCommand(GulpCommand):
             self.working_dir = self.gulp_files[file_index]
             try:
                 cache_file = CacheFile(self.working_dir)
+                TaskCache.remove(self.get_gulpfile_path(self.working_dir))
                 if cache_file.exists():
                     cache_file.remove()
                     self.status_message('Cache removed successfully')
@@ -365,10 +627,66 @@ class GulpDeleteCacheCommand(GulpCommand):
                 self.status_message("Could not remove cache: %s" % str(e))
 
 
+class GulpTaskTimingsCommand(BaseCommand):
+    def work(self):
+        self.timings = TaskHistory.timings()
+        if not self.timings:
+            return self.status_message("No task has finished yet")
+
+        self.threshold = self.settings.get("task_timings_regression_threshold_percent", 20)
+        self.show_quick_panel([self.timings_row(timings) for timings in self.timings], self.show_runs)
+
+    def timings_row(self, timings):
+        slower = timings.regression(self.threshold)
+        regressed = " (%d%% slower than usual)" % slower if slower is not None else ""
+        stats = "last %s | p50 %s | p95 %s | %d run(s)" % (format_duration(timings.last_run()[1]), format_duration(timings.percentile(50)), format_duration(timings.percentile(95)), len(timings.runs))
+        return [timings.task_name + regressed, stats, timings.gulpfile]
+
+    def show_runs(self, index=-1):
+        if index < 0:
+            return
+
+        timings = self.timings[index]
+        self.show_output_panel("Runs of '%s' on %s:\n" % (timings.task_name, timings.gulpfile))
+        for (started_at, duration, returncode, flags) in reversed(timings.runs):
+            started = datetime.fromtimestamp(started_at).strftime("%Y-%m-%d %H:%M:%S")
+            self.append_to_output_view("%s  %8s  exit code: %s  %s\n" % (started, format_duration(duration), returncode, flags))
+
+
+class GulpTaskWaterfallCommand(BaseCommand):
+    def work(self):
+        # Running tasks are included too, their open sub-tasks are drawn up to now
+        self.timelines = list(reversed(TaskTimeline.with_entries()))
+        if not self.timelines:
+            return self.status_message("No task has logged its sub-tasks yet")
+
+        if len(self.timelines) == 1:
+            self.show_waterfall(0)
+        else:
+            items = [[timeline.command, "%d sub-task(s) | %s" % (len(timeline.entries), datetime.fromtimestamp(timeline.started_at).strftime("%Y-%m-%d %H:%M:%S"))] for timeline in self.timelines]
+            self.show_quick_panel(items, self.show_waterfall)
+
+    def show_waterfall(self, index=-1):
+        if index >= 0:
+            self.show_output_panel("")
+            self.append_to_output_view(self.timelines[index].render())
+
+
+class GulpOpenOutputArchiveCommand(BaseCommand):
+    def work(self):
+        archive = OutputArchive.latest(self.window)
+        if archive is None:
+            return self.status_message("No output has been archived yet, check the results_max_lines setting")
+
+        self.window.open_file("%s:%d" % (archive.path, archive.first_line()), sublime.ENCODED_POSITION)
+
+
 class GulpExitCommand(sublime_plugin.WindowCommand):
     def run(self):
         try:
             self.window.run_command("gulp_kill")
+            ProcessCache.flush()
+            TaskHistory.flush()
         finally:
             self.window.run_command("exit")
 
@@ -385,17 +703,32 @@ class GulpUpdateStatusBarCommand(sublime_plugin.TextCommand):
             # it means it is an transient view of a regular file
             return
 
-        StatusBar(window).update()
+        StatusBar(window).update(self.view)
 
 
 def plugin_loaded():
     def load_process_cache():
         for process in ProcessCache.get_from_storage():
             ProcessCache.add(
-                CrossPlatformProcess(process['working_dir'], process['last_command'], process['pid'])
+                CrossPlatformProcess(process['working_dir'], process['last_command'], process['pid'], process.get('start_time'))
             )
 
-    async(load_process_cache, 200, silent=True)
+    run_async(load_process_cache, 200, silent=True)
+    OutputArchive.remove_stale()
+
+    for window in sublime.windows():
+        window.run_command("gulp_prewarm")
+
+
+def plugin_unloaded():
+    Settings.stop_listening()
+    OutputArchive.discard_all()
+    StreamCapture.remove_spill_files()
+    TaskHistory.flush()
+    ProcessReaper.stop()
+    ProcessMetrics.stop()
+    ProcessCache.flush()
+    NodeWorker.stop()
 
 
 if not is_sublime_text_3:
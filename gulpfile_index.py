@@ -0,0 +1,64 @@
+import sublime
+from threading import Lock
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .settings import Settings
+    from .caches import CacheFile
+else:
+    from settings import Settings
+    from caches import CacheFile
+
+
+class GulpfileIndex():
+    """
+    Results of the recursive gulpfile search for each project folder, persisted between sessions.
+    Every visited directory is stored with its stat fingerprint (see GulpfileWalker), so a later search
+    only lists the directories whose mtime changed (adding or removing an entry changes it) and stats the rest.
+    """
+
+    FILE_NAME = ".sublime-gulp-index.cache"
+
+    lock = Lock()
+    folders = None
+
+    @classmethod
+    def find(cls, folder_path, walker):
+        """ Returns ([visited directories], [gulpfile paths]) using a GulpfileWalker """
+        with cls.lock:
+            cls.load()
+            previous_dirs = cls.folders.get(folder_path, {})
+            (dirs, visited, gulpfiles) = walker.walk(folder_path, previous_dirs)
+
+            if dirs != previous_dirs:
+                cls.folders[folder_path] = dirs
+                cls.save()
+
+            return (visited, gulpfiles)
+
+    @classmethod
+    def forget(cls, folder_paths):
+        with cls.lock:
+            cls.load()
+            for folder_path in folder_paths:
+                cls.folders.pop(folder_path, None)
+            cls.save()
+
+    @classmethod
+    def load(cls):
+        if cls.folders is None:
+            storage = cls.storage()
+            data = storage.read() if storage.exists() else None
+            cls.folders = data if isinstance(data, dict) else {}
+
+    @classmethod
+    def save(cls):
+        try:
+            cls.storage().write(cls.folders)
+        except (IOError, OSError) as e:
+            print("%s: Could not save the gulpfile index. %s" % (Settings.PACKAGE_NAME, str(e)))
+
+    @classmethod
+    def storage(cls):
+        return CacheFile(Settings.package_path(), GulpfileIndex.FILE_NAME, shared=True)
@@ -0,0 +1,192 @@
+import sublime
+import codecs
+import fnmatch
+import os
+import re
+from threading import Thread
+
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .hasher import Hasher
+else:
+    from hasher import Hasher
+
+
+class GulpfileWalker():
+    """
+    Recursive gulpfile search shared between a few threads.
+    Folders are pruned using the ignore patterns (glob style), every .gitignore found on the way and `max_depth`.
+
+    Each visited directory ends up on `dirs` as { path: [fingerprint, subdirectories, gulpfile name, gitignore] },
+    where gitignore is None or [fingerprint, lines]. If a directory didn't change since the previous walk
+    its previous entry is used instead of listing it again.
+    """
+
+    GITIGNORE = ".gitignore"
+
+    def __init__(self, gulpfile_names, ignored_folders=[], use_gitignore=True, max_depth=0, threads=4):
+        self.gulpfile_names = gulpfile_names
+        self.ignored_folders = ignored_folders
+        self.use_gitignore = use_gitignore
+        self.max_depth = max_depth
+        self.threads = max(threads, 1)
+
+    def walk(self, folder_path, previous_dirs={}):
+        """ Returns (dirs, [visited directories], [gulpfile paths]) """
+        self.previous_dirs = previous_dirs
+        self.dirs = {}
+        self.gulpfiles = []
+        self.ignored = IgnoreRules(folder_path, self.ignored_folders)
+
+        pending = queue.Queue()
+        pending.put((folder_path, 0, []))
+
+        workers = [Thread(target=self.work, args=(pending, )) for i in range(self.threads)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        pending.join()
+        for worker in workers:
+            pending.put(None)
+
+        visited = sorted(self.dirs.keys(), key=self.sort_key)
+        gulpfiles = sorted(self.gulpfiles, key=lambda path: self.sort_key(os.path.dirname(path)))
+        return (self.dirs, visited, gulpfiles)
+
+    def work(self, pending):
+        while True:
+            item = pending.get()
+            if item is None:
+                pending.task_done()
+                return
+
+            try:
+                self.visit(pending, *item)
+            except (IOError, OSError):
+                pass
+            finally:
+                pending.task_done()
+
+    def visit(self, pending, dirpath, depth, gitignores):
+        fingerprint = Hasher.stat_fingerprint(dirpath)
+        previous = self.previous_dirs.get(dirpath)
+
+        if previous is not None and len(previous) == 4 and previous[0] == fingerprint:
+            (subdirs, gulpfile, gitignore) = previous[1:]
+            gitignore = self.read_gitignore(dirpath, gitignore) if gitignore is not None else None
+        else:
+            (subdirs, gulpfile, has_gitignore) = self.list_dir(dirpath)
+            gitignore = self.read_gitignore(dirpath) if has_gitignore else None
+
+        self.dirs[dirpath] = [fingerprint, subdirs, gulpfile, gitignore]
+        if gulpfile:
+            self.gulpfiles.append(os.path.normpath(os.path.join(dirpath, gulpfile)))
+
+        if self.max_depth and depth >= self.max_depth:
+            return
+
+        if self.use_gitignore and gitignore is not None:
+            gitignores = gitignores + [IgnoreRules(dirpath, gitignore[1])]
+
+        for subdir in subdirs:
+            subdir_path = os.path.join(dirpath, subdir)
+            if not self.is_ignored(subdir_path, subdir, gitignores):
+                pending.put((subdir_path, depth + 1, gitignores))
+
+    def list_dir(self, dirpath):
+        if scandir is not None:
+            entries = list(scandir(dirpath))
+            names = set(entry.name for entry in entries)
+            # Like os.walk, symlinked folders are not followed
+            subdirs = [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
+        else:
+            names = set(os.listdir(dirpath))
+            subdirs = [name for name in names if os.path.isdir(os.path.join(dirpath, name)) and not os.path.islink(os.path.join(dirpath, name))]
+
+        gulpfile = next((name for name in self.gulpfile_names if name in names), None)
+        return (subdirs, gulpfile, GulpfileWalker.GITIGNORE in names)
+
+    def read_gitignore(self, dirpath, previous=None):
+        gitignore_path = os.path.join(dirpath, GulpfileWalker.GITIGNORE)
+        try:
+            fingerprint = Hasher.stat_fingerprint(gitignore_path)
+        except OSError:
+            return None
+
+        if previous is not None and previous[0] == fingerprint:
+            return previous
+
+        with codecs.open(gitignore_path, "r", "utf-8", errors='replace') as gitignore_file:
+            return [fingerprint, gitignore_file.read().splitlines()]
+
+    def is_ignored(self, path, name, gitignores):
+        if self.ignored.match(path, name):
+            return True
+
+        # The closest .gitignore has the last word
+        ignored = None
+        for rules in gitignores:
+            result = rules.match(path, name)
+            if result is not None:
+                ignored = result
+        return bool(ignored)
+
+    def sort_key(self, path):
+        return path.split(os.sep)
+
+
+class IgnoreRules():
+    """
+    Glob patterns relative to `base_path`, following the .gitignore format for folders:
+    patterns without a slash match the folder name at any depth, the rest are matched against the relative path.
+    """
+
+    def __init__(self, base_path, patterns):
+        self.base_path = base_path
+        self.rules = [rule for rule in (self.parse(pattern) for pattern in patterns) if rule is not None]
+
+    def parse(self, pattern):
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            return None
+
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+
+        pattern = pattern.rstrip("/")
+        if pattern.startswith("**/"):
+            pattern = pattern[3:]
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        if not pattern:
+            return None
+
+        return (re.compile(fnmatch.translate(pattern)), anchored, negated)
+
+    def match(self, path, name):
+        """ Returns True if ignored, False if explicitly included (!pattern) and None if no rule matched """
+        if not self.rules:
+            return None
+
+        relative_path = os.path.relpath(path, self.base_path).replace(os.sep, "/")
+        result = None
+
+        for (regex, anchored, negated) in self.rules:
+            if regex.match(relative_path if anchored else name):
+                result = not negated
+
+        return result
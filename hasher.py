@@ -8,9 +8,57 @@ import re
 
 
 class Hasher():
+    # path => (fingerprint, sha1). The content is only hashed again if the fingerprint changes
+    _memo = {}
+
     @classmethod
     def sha1(self, filepath):
-        return self.hashdir(filepath) if os.path.isdir(filepath) else self.hashfile(filepath)
+        fingerprint = self.fingerprint(filepath)
+        memo = self._memo.get(filepath)
+
+        if memo is not None and memo[0] == fingerprint:
+            return memo[1]
+
+        sha1 = self.hashdir(filepath) if os.path.isdir(filepath) else self.hashfile(filepath)
+        self._memo[filepath] = (fingerprint, sha1)
+        return sha1
+
+    @classmethod
+    def seed(self, filepath, fingerprint, sha1):
+        # Used to restore fingerprints persisted from a previous session
+        if filepath not in self._memo:
+            self._memo[filepath] = (fingerprint, sha1)
+
+    @classmethod
+    def memoized_fingerprint(self, filepath):
+        memo = self._memo.get(filepath)
+        return memo[0] if memo is not None else None
+
+    @classmethod
+    def stat_fingerprint(self, path):
+        return self._statfingerprint(os.stat(path))
+
+    @classmethod
+    def fingerprint(self, filepath):
+        if os.path.isdir(filepath):
+            return self.fingerprintdir(filepath)
+        return self._statfingerprint(os.stat(filepath))
+
+    @classmethod
+    def fingerprintdir(self, dirpath):
+        hasher = hashlib.sha1()
+        for root, dirs, files in os.walk(dirpath, topdown=True):
+            if not re.search(r'/\.', root):
+                for f in sorted(files):
+                    if not f.startswith('.'):
+                        filepath = os.path.join(root, f)
+                        hasher.update(str((filepath, self._statfingerprint(os.stat(filepath)))).encode('utf-8'))
+        return [hasher.hexdigest()]
+
+    @classmethod
+    def _statfingerprint(self, stat):
+        mtime_ns = getattr(stat, 'st_mtime_ns', None) or int(stat.st_mtime * 1e9)
+        return [stat.st_ino, stat.st_size, mtime_ns]
 
     @classmethod
     def hashfile(self, filepath):
@@ -30,6 +78,22 @@ class Hasher():
                 hashvalues.extend(values)
         return self._reducehash(hashvalues)
 
+    @classmethod
+    def listing_sha1(self, dirpath):
+        # Adding, removing or renaming an entry changes the folder mtime
+        key = ('listing', dirpath)
+        fingerprint = self._statfingerprint(os.stat(dirpath))
+        memo = self._memo.get(key)
+
+        if memo is not None and memo[0] == fingerprint:
+            return memo[1]
+
+        # Same as generateListingsha1 on write_tasks_to_cache.js
+        names = sorted(name for name in os.listdir(dirpath) if not name.startswith('.'))
+        sha1 = hashlib.sha1("\n".join(names).encode('utf-8')).hexdigest()
+        self._memo[key] = (fingerprint, sha1)
+        return sha1
+
     @classmethod
     def _dirfilehash(self, filepath):
         hasher = hashlib.sha1()
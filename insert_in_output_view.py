@@ -5,27 +5,46 @@ is_sublime_text_3 = int(sublime.version()) >= 3000
 
 if is_sublime_text_3:
     from .cross_platform_codecs import CrossPlatformCodecs
+    from .output_archive import OutputArchive
     from .timeout import set_timeout
 else:
     from cross_platform_codecs import CrossPlatformCodecs
+    from output_archive import OutputArchive
     from timeout import set_timeout
 
 
-def insert_in_output_view(view, content, in_new_tab):
+def insert_in_output_view(view, content, in_new_tab, max_lines=0):
     if view is None:
         return
 
     if in_new_tab and view.is_loading():
-        set_timeout(lambda: insert_in_output_view(view, content, in_new_tab), 10)
+        set_timeout(lambda: insert_in_output_view(view, content, in_new_tab, max_lines), 10)
     else:
         decoded_contenet = content if is_sublime_text_3 else CrossPlatformCodecs.force_decode(content)
 
         view.set_read_only(False)
         view.run_command("view_insert", { "size": view.size(), "content": decoded_contenet })
+        if max_lines:
+            OutputArchive.for_view(view).write(decoded_contenet)
+            trim_output_view(view, max_lines)
         view.set_viewport_position((0, view.size()), True)
         view.set_read_only(True)
 
 
+def trim_output_view(view, max_lines):
+    # The view is let grow a tenth over the limit before cutting it back,
+    # so the head is erased (and the rest re-highlighted) once in a while instead of on every insert
+    lines = view.rowcol(view.size())[0]
+    if lines > max_lines + max(max_lines // 10, 1):
+        view.run_command("view_erase_head", { "size": view.text_point(lines - max_lines, 0) })
+        OutputArchive.for_view(view).trimmed(lines - max_lines)
+
+
 class ViewInsertCommand(sublime_plugin.TextCommand):
     def run(self, edit, size, content):
         self.view.insert(edit, int(size), content)
+
+
+class ViewEraseHeadCommand(sublime_plugin.TextCommand):
+    def run(self, edit, size):
+        self.view.erase(edit, sublime.Region(0, int(size)))
@@ -0,0 +1,155 @@
+import sublime
+import os
+import traceback
+from threading import Thread, Lock
+
+try:
+    import selectors
+except ImportError:
+    selectors = None
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .cross_platform_codecs import LineDecoder
+else:
+    from cross_platform_codecs import LineDecoder
+
+
+class IOLoop():
+    """
+    A single thread multiplexing the output of every running task.
+    Used instead of a pair of reader threads per process when `nonblocking` is set to "selector".
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    EXIT_POLL_INTERVAL = 0.1
+
+    lock = Lock()
+    selector = None
+    wakeup = None
+    incoming = []
+    exiting = []
+
+    @classmethod
+    def available(cls):
+        # select() doesn't work with pipes on Windows
+        return selectors is not None and sublime.platform() != "windows"
+
+    @classmethod
+    def add(cls, process, fn, on_finish):
+        watcher = ProcessWatcher(process, fn, on_finish)
+        with cls.lock:
+            cls.start()
+            cls.incoming.append(watcher)
+        os.write(cls.wakeup[1], b'.')
+
+    @classmethod
+    def start(cls):
+        if cls.selector is not None:
+            return
+
+        cls.selector = selectors.DefaultSelector()
+        cls.wakeup = os.pipe()
+        cls.selector.register(cls.wakeup[0], selectors.EVENT_READ)
+
+        thread = Thread(target=cls.run)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def run(cls):
+        while True:
+            timeout = cls.EXIT_POLL_INTERVAL if cls.exiting else None
+
+            for (key, events) in cls.selector.select(timeout):
+                if key.fd == cls.wakeup[0]:
+                    os.read(key.fd, 1024)
+                    cls.register_incoming()
+                else:
+                    cls.read(key.data)
+
+            cls.reap()
+
+    @classmethod
+    def register_incoming(cls):
+        with cls.lock:
+            watchers = cls.incoming[:]
+            del cls.incoming[:]
+
+        for watcher in watchers:
+            for reader in watcher.readers:
+                cls.selector.register(reader.fd, selectors.EVENT_READ, reader)
+
+    @classmethod
+    def read(cls, reader):
+        try:
+            chunk = os.read(reader.fd, cls.CHUNK_SIZE)
+        except OSError:
+            chunk = None
+
+        if chunk:
+            guard(reader.feed, chunk)
+        else:
+            cls.selector.unregister(reader.fd)
+            guard(reader.close)
+            if reader.watcher.streams_closed():
+                cls.exiting.append(reader.watcher)
+
+    @classmethod
+    def reap(cls):
+        for watcher in cls.exiting[:]:
+            if watcher.exited():
+                cls.exiting.remove(watcher)
+                guard(watcher.finish)
+
+
+class ProcessWatcher():
+    def __init__(self, process, fn, on_finish):
+        self.process = process
+        self.on_finish = on_finish
+        self.readers = [StreamReader(self, stream, process.new_capture(), fn) for stream in [process.process.stdout, process.process.stderr]]
+
+    def streams_closed(self):
+        return all(reader.closed for reader in self.readers)
+
+    def exited(self):
+        return self.process.process.poll() is not None
+
+    def finish(self):
+        self.process.terminate()
+        (stdout, stderr) = [reader.capture for reader in self.readers]
+        self.on_finish(stdout, stderr)
+
+
+class StreamReader():
+    def __init__(self, watcher, stream, capture, fn):
+        self.watcher = watcher
+        self.stream = stream
+        self.fd = stream.fileno()
+        self.capture = capture
+        self.fn = fn
+        self.decoder = LineDecoder()
+        self.closed = False
+
+    def feed(self, chunk):
+        self.emit(self.decoder.feed(chunk))
+
+    def close(self):
+        self.closed = True
+        self.emit(self.decoder.flush())
+        self.capture.close()
+        self.stream.close()
+
+    def emit(self, lines):
+        for line in lines:
+            self.capture.append(line)
+            self.fn(line)
+
+
+def guard(fn, *args):
+    # An error on a callback shouldn't take down the loop for every other task
+    try:
+        fn(*args)
+    except Exception:
+        print(traceback.format_exc())
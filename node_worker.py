@@ -0,0 +1,124 @@
+import sublime
+import subprocess
+import json
+import os
+from threading import Lock, Timer
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .settings import Settings
+    from .cross_platform_process import Env
+else:
+    from settings import Settings
+    from cross_platform_process import Env
+
+
+class NodeWorker():
+    """
+    Keeps a `node tasks_worker.js` process alive between task listings, so the gulpfile
+    dependencies are already loaded the next time the cache needs to be written.
+    The process is started lazily and stopped after `idle_timeout` seconds without requests.
+    """
+
+    RESPONSE_PREFIX = "@@sublime-gulp@@ "
+    REQUEST_TIMEOUT = 60
+
+    lock = Lock()
+    process = None
+    idle_timer = None
+    last_id = 0
+
+    @classmethod
+    def write_tasks_to_cache(cls, working_dir, idle_timeout=300):
+        with cls.lock:
+            cls.cancel_idle_timer()
+            try:
+                cls.request({ "cwd": working_dir })
+            finally:
+                cls.start_idle_timer(idle_timeout)
+
+    @classmethod
+    def request(cls, data):
+        process = cls.start()
+
+        cls.last_id += 1
+        data["id"] = cls.last_id
+
+        # If node hangs (for example a gulpfile waiting on something) kill it so the read below returns
+        request_timer = Timer(cls.REQUEST_TIMEOUT, cls.stop)
+        request_timer.start()
+
+        try:
+            process.stdin.write((json.dumps(data) + "\n").encode('utf-8'))
+            process.stdin.flush()
+            response = cls.read_response(process, data["id"])
+        except (IOError, OSError, ValueError):
+            cls.stop()
+            raise Exception("The node worker stopped unexpectedly")
+        finally:
+            request_timer.cancel()
+
+        if "error" in response:
+            raise Exception(response["error"])
+
+        return response
+
+    @classmethod
+    def read_response(cls, process, request_id):
+        while True:
+            line = process.stdout.readline()
+            if not line:
+                raise IOError("node worker closed its output")
+
+            # Anything else was printed by the gulpfile itself
+            line = line.decode('utf-8', 'replace')
+            if line.startswith(cls.RESPONSE_PREFIX):
+                response = json.loads(line[len(cls.RESPONSE_PREFIX):])
+                if response.get("id") == request_id:
+                    return response
+
+    @classmethod
+    def start(cls):
+        if cls.process is None or cls.process.poll() is not None:
+            worker_path = os.path.join(Settings.package_path(), "tasks_worker.js")
+            env = Env.get_path(Settings.get_from_shared_data("exec_args", False))
+            with open(os.devnull, "w") as devnull:
+                cls.process = subprocess.Popen(["node", worker_path], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=devnull, env=env, startupinfo=cls.startupinfo())
+        return cls.process
+
+    @classmethod
+    def startupinfo(cls):
+        # Started without a shell, so on Windows the console window has to be hidden by hand
+        if sublime.platform() != "windows":
+            return None
+
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= getattr(subprocess, "STARTF_USESHOWWINDOW", 1)
+        startupinfo.wShowWindow = getattr(subprocess, "SW_HIDE", 0)
+        return startupinfo
+
+    @classmethod
+    def stop(cls):
+        process = cls.process
+        cls.process = None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    @classmethod
+    def start_idle_timer(cls, idle_timeout):
+        cls.idle_timer = Timer(idle_timeout, cls.stop_when_idle)
+        cls.idle_timer.daemon = True
+        cls.idle_timer.start()
+
+    @classmethod
+    def cancel_idle_timer(cls):
+        if cls.idle_timer is not None:
+            cls.idle_timer.cancel()
+            cls.idle_timer = None
+
+    @classmethod
+    def stop_when_idle(cls):
+        with cls.lock:
+            cls.stop()
@@ -0,0 +1,112 @@
+import sublime
+import codecs
+import os
+import time
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .settings import Settings
+else:
+    from settings import Settings
+
+
+class OutputArchive():
+    """
+    Everything written to an output view capped by `results_max_lines`, appended to a log on the package folder.
+    The view only keeps the last lines, the archive keeps the rest for `gulp_open_output_archive`.
+    Each view gets its own file, which lives as long as the view does.
+    """
+
+    FILE_PREFIX = ".sublime-gulp-output-"
+
+    _views = {}
+
+    @classmethod
+    def for_view(cls, view):
+        archive = cls._views.get(view.id())
+        if archive is None:
+            window = view.window()
+            archive = OutputArchive(view.id(), window.id() if window else None)
+            cls._views[view.id()] = archive
+        return archive
+
+    @classmethod
+    def latest(cls, window):
+        archives = [archive for archive in cls._views.values() if archive.window_id == window.id()]
+        return max(archives, key=lambda archive: archive.written_at) if archives else None
+
+    @classmethod
+    def cleared(cls, view):
+        """ The output panel is emptied and reused on each run, so its archive goes on from a new base line """
+        archive = cls._views.get(view.id())
+        if archive is not None:
+            archive.restart()
+
+    @classmethod
+    def discard(cls, view):
+        archive = cls._views.pop(view.id(), None)
+        if archive is not None:
+            archive.remove()
+
+    @classmethod
+    def discard_all(cls):
+        for view_id in list(cls._views):
+            cls._views.pop(view_id).remove()
+
+    @classmethod
+    def remove_stale(cls):
+        """ The views of a previous session are gone, and so is the output their archives were keeping """
+        package_path = Settings.package_path()
+        if not os.path.isdir(package_path):
+            return
+
+        for file_name in os.listdir(package_path):
+            if file_name.startswith(cls.FILE_PREFIX):
+                try:
+                    os.remove(os.path.join(package_path, file_name))
+                except OSError:
+                    pass
+
+    def __init__(self, view_id, window_id):
+        self.window_id = window_id
+        self.path = os.path.join(Settings.package_path(), "%s%d.log" % (OutputArchive.FILE_PREFIX, view_id))
+        self.file = None
+        self.lines = 0
+        self.base_line = 0
+        self.trimmed_lines = 0
+        self.written_at = 0
+
+    def write(self, text):
+        try:
+            if self.file is None:
+                self.file = codecs.open(self.path, "w", "utf-8")
+            self.file.write(text)
+            self.file.flush()
+            self.lines += text.count("\n")
+            self.written_at = time.time()
+        except (IOError, OSError) as e:
+            print("%s: Could not archive the output. %s" % (Settings.PACKAGE_NAME, str(e)))
+
+    def trimmed(self, lines):
+        self.trimmed_lines += lines
+
+    def restart(self):
+        self.base_line = self.lines
+        self.trimmed_lines = 0
+
+    def first_line(self):
+        """ Archive line (1-based) right above the first line the view still has """
+        return max(self.base_line + self.trimmed_lines, 1)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,56 @@
+import sublime
+from threading import Lock
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .timeout import set_timeout, defer_sync
+else:
+    from timeout import set_timeout, defer_sync
+
+
+class OutputBuffer():
+    """
+    Gathers text coming from the reader threads and writes it to the output view
+    at most once per frame (or sooner if the buffered text grows past `max_size`)
+
+    :param flush_fn:
+        Called in the main thread with all the text buffered since the last flush
+    """
+
+    FLUSH_INTERVAL = 16
+    MAX_SIZE = 64 * 1024
+
+    def __init__(self, flush_fn, interval=FLUSH_INTERVAL, max_size=MAX_SIZE):
+        self.flush_fn = flush_fn
+        self.interval = interval
+        self.max_size = max_size
+        self.lock = Lock()
+        self.chunks = []
+        self.size = 0
+        self.scheduled = False
+        self.flushing_now = False
+
+    def append(self, text):
+        with self.lock:
+            self.chunks.append(text)
+            self.size += len(text)
+
+            if not self.scheduled:
+                self.scheduled = True
+                set_timeout(self.flush, self.interval)
+
+            if self.size >= self.max_size and not self.flushing_now:
+                self.flushing_now = True
+                defer_sync(self.flush)
+
+    def flush(self):
+        with self.lock:
+            text = "".join(self.chunks)
+            del self.chunks[:]
+            self.size = 0
+            self.scheduled = False
+            self.flushing_now = False
+
+        if text:
+            self.flush_fn(text)
@@ -1,64 +1,302 @@
 import sublime
-from threading import Thread
+import codecs
+import json
+import os
+import re
+import time
+import traceback
+from bisect import bisect_left
+from threading import Thread, Lock
 
 is_sublime_text_3 = int(sublime.version()) >= 3000
 
 if is_sublime_text_3:
     import urllib.request as urllib2
+    from .settings import Settings
+    from .caches import CompressedCacheFile
 else:
     import urllib2
+    from settings import Settings
+    from caches import CompressedCacheFile
 
 
 class PluginList():
-    def __init__(self, plugins_response):
-        self.plugins = [Plugin(plugin_json) for plugin_json in plugins_response["results"]]
+    """
+    Registry plugins sorted by rating, searchable by words (or the start of them) of their name and description.
+    The word index is built on the first search.
+    """
+
+    WORD_SEPARATOR = re.compile(r"[^a-z0-9]+")
+
+    @classmethod
+    def from_response(cls, plugins_response):
+        return PluginList([Plugin.from_json(plugin_json) for plugin_json in plugins_response["results"]])
+
+    @classmethod
+    def from_rows(cls, rows):
+        return PluginList([Plugin(*row) for row in rows])
+
+    def __init__(self, plugins):
+        self.plugins = sorted(plugins, key=lambda plugin: -plugin.rating)
         self.length = len(self.plugins)
+        self.word_index = None
 
     def get(self, index):
         if index >= 0 and index < self.length:
             return self.plugins[index]
 
-    def quick_panel_list(self):
-        return [ [plugin.name + ' (' + plugin.version + ')', plugin.description] for plugin in self.plugins ]
+    def to_rows(self):
+        return [plugin.to_row() for plugin in self.plugins]
+
+    def search(self, query):
+        """ Plugins matching every word of `query` (as a prefix), the ones matching on their name first and then by rating """
+        terms = [term for term in PluginList.WORD_SEPARATOR.split(query.lower()) if term]
+        if not terms:
+            return self.plugins
+
+        index = self.words()
+        matches = None
+        for term in terms:
+            found = set()
+            position = bisect_left(index, (term, ))
+            while position < len(index) and index[position][0].startswith(term):
+                found.add(index[position][1])
+                position += 1
+            matches = found if matches is None else matches & found
+
+        plugins = [self.plugins[position] for position in sorted(matches)]
+        return sorted(plugins, key=lambda plugin: -plugin.relevance(terms))
+
+    def words(self):
+        """ Sorted (word, plugin position) pairs """
+        if self.word_index is None:
+            pairs = set()
+            for (position, plugin) in enumerate(self.plugins):
+                for word in PluginList.WORD_SEPARATOR.split((plugin.name + " " + plugin.description).lower()):
+                    if word:
+                        pairs.add((word, position))
+            self.word_index = sorted(pairs)
+        return self.word_index
+
+    def quick_panel_list(self, plugins=None, installed={}):
+        return [plugin.quick_panel_item(installed.get(plugin.name)) for plugin in (self.plugins if plugins is None else plugins)]
 
 
 class Plugin():
-    def __init__(self, plugin_json):
-        self.plugin = plugin_json
-        self.set_attributes()
+    __slots__ = ("name", "version", "description", "homepage", "rating")
 
-    def set_attributes(self):
-        self.name = self.get('name')
-        self.version = "v" + self.get('version')
-        self.description = self.get('description')
+    @classmethod
+    def from_json(cls, plugin_json):
+        def get(property, default=''):
+            return plugin_json[property][0] if property in plugin_json and plugin_json[property] else default
 
-    def get(self, property):
-        return self.plugin[property][0] if self.has(property) else ''
+        return Plugin(get('name'), get('version'), get('description'), get('homepage'), float(get('rating', 0) or 0))
 
-    def has(self, property):
-        return property in self.plugin
+    def __init__(self, name, version, description, homepage, rating):
+        self.name = name
+        self.version = version
+        self.description = description
+        self.homepage = homepage
+        self.rating = rating
 
+    def to_row(self):
+        return [self.name, self.version, self.description, self.homepage, self.rating]
 
-class PluginRegistryCall(Thread):
-    url = "http://npmsearch.com/query?fields=name,description,homepage,version,rating&q=keywords:gulpfriendly&q=keywords:gulpplugin&size=1755&sort=rating:desc&start=20"
+    def relevance(self, terms):
+        name = self.name.lower()
+        short_name = name[5:] if name.startswith("gulp-") else name
+        if short_name == " ".join(terms) or name == " ".join(terms):
+            return 3
+        if short_name.startswith(terms[0]):
+            return 2
+        if any(term in name for term in terms):
+            return 1
+        return 0
+
+    def quick_panel_item(self, installed_version=None):
+        installed = ' - installed %s' % installed_version if installed_version else ''
+        return [self.name + ' (v' + self.version + ')' + installed, self.description]
+
+
+def installed_packages(folders):
+    """ { name: version } of the dependencies on the package.json of each folder """
+    packages = {}
+    for folder in folders:
+        package_json_path = os.path.join(folder, "package.json")
+        if not os.path.exists(package_json_path):
+            continue
+
+        try:
+            with codecs.open(package_json_path, "r", "utf-8", errors='replace') as package_json:
+                package_data = json.load(package_json)
+        except (IOError, OSError, ValueError) as e:
+            print("%s: Could not read %s. %s" % (Settings.PACKAGE_NAME, package_json_path, str(e)))
+            continue
+
+        for key in ("dependencies", "devDependencies", "optionalDependencies"):
+            dependencies = package_data.get(key)
+            if isinstance(dependencies, dict):
+                packages.update(dependencies)
+
+    return packages
+
+
+class PluginRegistry():
+    """
+    The plugins of the registry response are kept on the package folder (gzipped, as PluginList rows)
+    alongside its ETag and Last-Modified headers. A cached copy is always used right away, once it's older than the TTL it's revalidated in the background
+    with a conditional request, so opening the list again (or offline) doesn't wait for the network.
+    """
+
+    URL = "http://npmsearch.com/query?fields=name,description,homepage,version,rating&q=keywords:gulpfriendly&q=keywords:gulpplugin&size=1755&sort=rating:desc&start=20"
+    FILE_NAME = ".sublime-gulp-plugins.cache.gz"
+
+    lock = Lock()
+    # { url, etag, last_modified, checked_at }, the plugins are only kept on plugin_list
+    entry = None
+    plugin_list = None
+    loaded = False
+    refreshing = False
 
-    def __init__(self, timeout=5):
+    @classmethod
+    def cached(cls, url):
+        """ The PluginList stored for `url`, None if there isn't one """
+        with cls.lock:
+            if not cls.loaded:
+                cls.loaded = True
+                cls.load()
+
+            if cls.entry is None or cls.entry.get("url") != url:
+                return None
+            return cls.plugin_list
+
+    @classmethod
+    def is_stale(cls, ttl_in_hours):
+        return cls.entry is None or time.time() - cls.entry.get("checked_at", 0) >= ttl_in_hours * 3600
+
+    @classmethod
+    def refresh(cls, url, on_done=None):
+        """
+        Requests the list (conditionally if there's a cached copy of `url`) on a thread.
+        `on_done` is called from that thread with (PluginList or None, error or None)
+        """
+        with cls.lock:
+            if cls.refreshing and on_done is None:
+                return
+            cls.refreshing = True
+            entry = cls.entry if cls.entry is not None and cls.entry.get("url") == url else None
+
+        def finish(call):
+            try:
+                (plugin_list, error) = cls.update(url, entry, call)
+            except Exception as e:
+                # on_done has to be called anyway, the command is waiting for it
+                print(traceback.format_exc())
+                (plugin_list, error) = (None, "Error: could not read the plugin registry response (%s)" % str(e))
+            if on_done is not None:
+                on_done(plugin_list, error)
+
+        call = PluginRegistryCall(url, etag=entry and entry.get("etag"), last_modified=entry and entry.get("last_modified"), on_finish=finish)
+        call.start()
+
+    @classmethod
+    def update(cls, url, entry, call):
+        try:
+            if call.not_modified and entry is not None:
+                entry["checked_at"] = time.time()
+            elif call.result:
+                plugin_list = PluginList.from_response(json.loads(call.result.decode('utf-8')))
+                entry = {
+                    "url": url,
+                    "etag": call.etag,
+                    "last_modified": call.last_modified,
+                    "checked_at": time.time()
+                }
+                with cls.lock:
+                    cls.entry = entry
+                    cls.plugin_list = plugin_list
+            elif call.not_modified:
+                return (None, "Error: the plugin registry answered 'not modified' but there's no cached copy")
+            else:
+                return (None, call.error or "Error: empty response from the plugin registry")
+        except (ValueError, KeyError, TypeError) as e:
+            return (None, "Error: invalid response from the plugin registry (%s)" % str(e))
+        finally:
+            with cls.lock:
+                cls.refreshing = False
+
+        cls.save(entry, cls.plugin_list)
+        return (cls.cached(url), None)
+
+    @classmethod
+    def load(cls):
+        storage = cls.storage()
+        try:
+            data = storage.read() if storage.exists() else None
+        except (IOError, OSError):
+            data = None
+
+        if isinstance(data, dict) and "plugins" in data:
+            cls.plugin_list = PluginList.from_rows(data.pop("plugins"))
+            cls.entry = data
+
+    @classmethod
+    def save(cls, entry, plugin_list):
+        data = dict(entry)
+        data["plugins"] = plugin_list.to_rows()
+        try:
+            cls.storage().write(data)
+        except (IOError, OSError) as e:
+            print("%s: Could not save the plugin list. %s" % (Settings.PACKAGE_NAME, str(e)))
+
+    @classmethod
+    def storage(cls):
+        return CompressedCacheFile(Settings.package_path(), PluginRegistry.FILE_NAME, shared=True)
+
+
+class PluginRegistryCall(Thread):
+    def __init__(self, url=PluginRegistry.URL, timeout=5, etag=None, last_modified=None, on_finish=None):
+        self.url = url
         self.timeout = timeout
+        self.etag = etag
+        self.last_modified = last_modified
+        self.on_finish = on_finish
         self.result = None
         self.error = None
+        self.not_modified = False
         Thread.__init__(self)
 
     def run(self):
         try:
-            request = urllib2.Request(self.url, None, headers={ "User-Agent": "Sublime Text" })
+            self.request()
+        finally:
+            if self.on_finish is not None:
+                self.on_finish(self)
+
+    def request(self):
+        headers = { "User-Agent": "Sublime Text" }
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        try:
+            request = urllib2.Request(self.url, None, headers=headers)
             http_file = urllib2.urlopen(request, timeout=self.timeout)
             self.result = http_file.read()
+            self.etag = http_file.info().get("ETag")
+            self.last_modified = http_file.info().get("Last-Modified")
             return
 
         except urllib2.HTTPError as e:
+            if e.code == 304:
+                self.not_modified = True
+                return
             err = 'Error: HTTP error %s contacting gulpjs registry' % (str(e.code))
         except urllib2.URLError as e:
             err = 'Error: URL error %s contacting gulpjs registry' % (str(e.reason))
+        except (IOError, OSError) as e:
+            err = 'Error: %s contacting gulpjs registry' % str(e)
 
         self.error = err
         self.result = None
@@ -0,0 +1,39 @@
+from threading import Lock
+
+
+class Prewarm():
+    """
+    Windows whose task cache was prewarmed, shared by every trigger (plugin_loaded and the window events)
+    so the gulpfiles of a window are prewarmed once per set of folders, and never twice at the same time.
+    """
+
+    lock = Lock()
+    # (window id, folders) already prewarmed or being prewarmed
+    done = set()
+    # ids of the windows with a prewarm running
+    running = set()
+
+    @classmethod
+    def key(cls, window):
+        return (window.id(), tuple(window.folders()))
+
+    @classmethod
+    def pending(cls, window):
+        return cls.key(window) not in cls.done
+
+    @classmethod
+    def claim(cls, window):
+        """ True if the caller should prewarm `window`, in which case it has to call release when it's done """
+        key = cls.key(window)
+        with cls.lock:
+            # A prewarm started for other folders is let finish, the next trigger will pick these ones up
+            if window.id() in cls.running or key in cls.done:
+                return False
+            cls.running.add(window.id())
+            cls.done.add(key)
+            return True
+
+    @classmethod
+    def release(cls, window):
+        with cls.lock:
+            cls.running.discard(window.id())
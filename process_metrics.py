@@ -0,0 +1,216 @@
+import sublime
+import os
+import time
+from threading import Thread, Condition
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .settings import Settings
+    from .caches import ProcessCache
+    from .timeout import defer_sync
+else:
+    from settings import Settings
+    from caches import ProcessCache
+    from timeout import defer_sync
+
+
+class ProcessMetrics():
+    """
+    CPU and memory used by each running task, sampled from /proc every `task_metrics_interval_in_seconds`.
+    Tasks are started on their own session (setsid), so the usage of a task is the sum of every process
+    on the session with its pid, which covers whatever gulp spawns. Only available where /proc exists (Linux).
+    """
+
+    # pid => TaskUsage
+    usage = {}
+    # Incremented after each sample, alongside a call to each listener
+    version = 0
+    listeners = {}
+
+    condition = Condition()
+    thread = None
+    running = False
+    # pid => (cpu ticks, time) of the previous sample
+    previous = {}
+    warned = set()
+
+    @classmethod
+    def available(cls):
+        return os.path.isdir("/proc/self") and ProcessMetrics.clock_ticks() is not None
+
+    @classmethod
+    def clock_ticks(cls):
+        try:
+            return os.sysconf("SC_CLK_TCK")
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    @classmethod
+    def get(cls, process):
+        return cls.usage.get(process.pid)
+
+    @classmethod
+    def add_on_change(cls, key, fn):
+        cls.listeners[key] = fn
+
+    @classmethod
+    def wake(cls):
+        if not cls.available() or cls.interval() <= 0:
+            return
+
+        with cls.condition:
+            if cls.thread is None:
+                cls.running = True
+                cls.thread = Thread(target=cls.run)
+                cls.thread.daemon = True
+                cls.thread.start()
+            cls.condition.notify()
+
+    @classmethod
+    def stop(cls):
+        with cls.condition:
+            cls.running = False
+            cls.condition.notify()
+
+    @classmethod
+    def interval(cls):
+        return Settings.get_from_shared_data("task_metrics_interval_in_seconds", 0)
+
+    @classmethod
+    def run(cls):
+        while True:
+            with cls.condition:
+                while cls.running and ProcessCache.empty():
+                    cls.usage = {}
+                    cls.previous = {}
+                    cls.warned.clear()
+                    cls.condition.wait()
+
+                if not cls.running:
+                    cls.thread = None
+                    return
+
+            try:
+                cls.sample(ProcessCache.get())
+            except (IOError, OSError) as e:
+                print("%s: Could not sample the running tasks. %s" % (Settings.PACKAGE_NAME, str(e)))
+
+            with cls.condition:
+                if cls.running:
+                    cls.condition.wait(max(cls.interval(), 0.5))
+
+    @classmethod
+    def sample(cls, processes):
+        now = time.time()
+        totals = cls.read_sessions([process.pid for process in processes])
+        ticks_per_second = float(cls.clock_ticks())
+
+        usage = {}
+        previous = {}
+        for process in processes:
+            (ticks, rss) = totals[process.pid]
+            cpu = None
+            if process.pid in cls.previous:
+                (previous_ticks, previous_time) = cls.previous[process.pid]
+                if now > previous_time:
+                    cpu = max(ticks - previous_ticks, 0) / ticks_per_second / (now - previous_time) * 100
+            previous[process.pid] = (ticks, now)
+            usage[process.pid] = TaskUsage(cpu, rss)
+
+        cls.previous = previous
+        cls.usage = usage
+        cls.version += 1
+
+        cls.warn(processes)
+        for fn in list(cls.listeners.values()):
+            fn()
+
+    @classmethod
+    def read_sessions(cls, session_ids):
+        """ Returns { session id: [cpu ticks, rss in bytes] } summing every process of each session """
+        totals = dict((session_id, [0, 0]) for session_id in session_ids)
+
+        for name in os.listdir("/proc"):
+            if not name.isdigit():
+                continue
+
+            fields = cls.read_stat(name)
+            if fields is None:
+                continue
+
+            # Fields are counted from the state (3rd), so session is the 6th, utime the 14th and stime the 15th
+            session_id = int(fields[3])
+            if session_id in totals:
+                totals[session_id][0] += int(fields[11]) + int(fields[12])
+                totals[session_id][1] += cls.read_rss(name)
+
+        return totals
+
+    @classmethod
+    def read_stat(cls, pid):
+        try:
+            with open("/proc/%s/stat" % pid) as stat_file:
+                stat = stat_file.read()
+        except (IOError, OSError):
+            # The process exited while listing /proc
+            return None
+
+        # The command name (2nd field) can contain spaces
+        return stat[stat.rindex(")") + 2:].split()
+
+    @classmethod
+    def read_rss(cls, pid):
+        try:
+            with open("/proc/%s/status" % pid) as status_file:
+                for line in status_file:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except (IOError, OSError, ValueError):
+            pass
+        return 0
+
+    @classmethod
+    def warn(cls, processes):
+        cpu_limit = Settings.get_from_shared_data("task_metrics_warning_cpu_percent", 0)
+        rss_limit = Settings.get_from_shared_data("task_metrics_warning_rss_in_mb", 0)
+
+        for process in processes:
+            usage = cls.usage[process.pid]
+            exceeded = []
+            if cpu_limit and usage.cpu is not None and usage.cpu >= cpu_limit:
+                exceeded.append("%s CPU" % usage.cpu_text())
+            if rss_limit and usage.rss >= rss_limit * 1024 * 1024:
+                exceeded.append("%s of memory" % usage.rss_text())
+
+            # Warned once each time a task goes over a limit
+            if exceeded and process.pid not in cls.warned:
+                cls.warned.add(process.pid)
+                message = "%s: %s is using %s" % (Settings.PACKAGE_NAME, process.last_command, " and ".join(exceeded))
+                print(message)
+                defer_sync(lambda message=message: sublime.status_message(message))
+            elif not exceeded:
+                cls.warned.discard(process.pid)
+
+
+class TaskUsage():
+    __slots__ = ("cpu", "rss")
+
+    def __init__(self, cpu, rss):
+        # cpu is None until there are two samples to compare
+        self.cpu = cpu
+        self.rss = rss
+
+    def cpu_text(self):
+        return "-" if self.cpu is None else "%d%%" % round(self.cpu)
+
+    def rss_text(self):
+        return "%.1f MB" % (self.rss / (1024.0 * 1024))
+
+    @classmethod
+    def total(cls, usages):
+        cpus = [usage.cpu for usage in usages if usage.cpu is not None]
+        return TaskUsage(sum(cpus) if cpus else None, sum(usage.rss for usage in usages))
+
+
+ProcessCache.add_on_change("process_metrics", ProcessMetrics.wake)
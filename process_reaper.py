@@ -0,0 +1,80 @@
+import sublime
+import time
+from threading import Thread, Condition
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .caches import ProcessCache
+else:
+    from caches import ProcessCache
+
+
+class ProcessReaper():
+    """
+    A single background thread removing the tasks that exited from ProcessCache, so the registry
+    (and the status bar, which listens to it) is accurate without checking every process at command time.
+
+    Children are polled (waitpid with WNOHANG) every INTERVAL. Restored processes, which are not children
+    of this plugin host, are checked every RESTORED_INTERVAL comparing their start time (see CrossPlatformProcess.is_alive).
+    The thread sleeps while there are no running tasks and wakes up when ProcessCache changes.
+    """
+
+    INTERVAL = 0.5
+    RESTORED_INTERVAL = 5
+
+    condition = Condition()
+    thread = None
+    running = False
+
+    @classmethod
+    def wake(cls):
+        with cls.condition:
+            if cls.thread is None:
+                cls.running = True
+                cls.thread = Thread(target=cls.run)
+                cls.thread.daemon = True
+                cls.thread.start()
+            cls.condition.notify()
+
+    @classmethod
+    def stop(cls):
+        with cls.condition:
+            cls.running = False
+            cls.condition.notify()
+
+    @classmethod
+    def run(cls):
+        last_restored_check = 0
+
+        while True:
+            with cls.condition:
+                while cls.running and ProcessCache.empty():
+                    cls.condition.wait()
+
+                if not cls.running:
+                    cls.thread = None
+                    return
+
+            check_restored = time.time() - last_restored_check >= cls.RESTORED_INTERVAL
+            if check_restored:
+                last_restored_check = time.time()
+
+            for process in ProcessCache.get():
+                if (process.is_child() or check_restored) and not cls.is_alive(process):
+                    ProcessCache.remove(process)
+
+            with cls.condition:
+                if cls.running:
+                    cls.condition.wait(cls.INTERVAL)
+
+    @classmethod
+    def is_alive(cls, process):
+        try:
+            return process.is_alive()
+        except (IOError, OSError) as e:
+            print("Could not check if %s (PID: %s) is running. %s" % (process.get_task_name(), process.pid, str(e)))
+            return True
+
+
+ProcessCache.add_on_change("process_reaper", ProcessReaper.wake)
@@ -11,28 +11,72 @@ class Settings():
 
     SHARED_DATA = {}
 
+    # window id => SettingsSnapshot of its current project
+    _snapshots = {}
+    listening = False
+
     @classmethod
     def package_path(cls):
         return os.path.join(sublime.packages_path(), Settings.PACKAGE_NAME)
 
     @classmethod
-    def gather_shared_data(cls):
-        settings = Settings()
-        Settings.SHARED_DATA = ProjectData({
-            'track_processes': settings.get("track_processes", True),
-            'nonblocking': settings.get("nonblocking", True),
-            'exec_args': settings.get("exec_args", False)
-        })
+    def gather_shared_data(cls, window=None):
+        Settings.SHARED_DATA = Settings.snapshot(window).shared_data()
 
     @classmethod
     def get_from_shared_data(cls, key, default=None):
         return Settings.SHARED_DATA.get(key, default)
 
-    def __init__(self):
+    @classmethod
+    def snapshot(cls, window=None):
+        window = window or sublime.active_window()
+        window_id = window.id() if window else None
+        project = Settings.project(window)
+
+        # Sublime Text 3 has no on_load_project, a window that switched projects is noticed here
+        snapshot = Settings._snapshots.get(window_id)
+        if snapshot is None or snapshot.project != project:
+            Settings.listen()
+            snapshot = SettingsSnapshot(window, project)
+            Settings._snapshots[window_id] = snapshot
+        return snapshot
+
+    @classmethod
+    def project(cls, window):
+        """ What the settings of a window depend on besides the user settings: its project file and folders """
+        if not window:
+            return None
+        project_file_name = window.project_file_name() if is_sublime_text_3 else None
+        return (project_file_name, tuple(window.folders()))
+
+    @classmethod
+    def invalidate(cls, window=None):
+        """ Drops the snapshot of `window`, or every snapshot if no window is given """
+        if window is None:
+            Settings._snapshots.clear()
+        else:
+            Settings._snapshots.pop(window.id(), None)
+
+    @classmethod
+    def listen(cls):
+        if not Settings.listening:
+            Settings.listening = True
+            sublime.load_settings(Settings.PACKAGE_SETTINGS).add_on_change(Settings.PACKAGE_NAME, Settings.invalidate)
+
+    @classmethod
+    def stop_listening(cls):
+        if Settings.listening:
+            Settings.listening = False
+            sublime.load_settings(Settings.PACKAGE_SETTINGS).clear_on_change(Settings.PACKAGE_NAME)
+        Settings.invalidate()
+
+    def __init__(self, window=None):
+        window = window or sublime.active_window()
         self.user_settings = sublime.load_settings(Settings.PACKAGE_SETTINGS)
-        self.sources = [ProjectData(), self.user_settings]
+        self.snapshot = Settings.snapshot(window)
+        self.sources = [self.snapshot]
 
-        active_view = sublime.active_window().active_view()
+        active_view = window.active_view() if window else None
         if active_view:
             self.sources.append(active_view.settings())
 
@@ -46,12 +90,54 @@ class Settings():
         return any(settings.has(key) for settings in self.sources)
 
 
+class SettingsSnapshot():
+    """
+    Project and user settings of a window, looked up once per key and kept until Settings.invalidate
+    is called (the user settings change or the project is loaded or saved) or the window switches projects
+    """
+
+    def __init__(self, window, project=None):
+        self.project = project
+        self.sources = [ProjectData(window=window), sublime.load_settings(Settings.PACKAGE_SETTINGS)]
+        # key => (value, ) or None if no source has it
+        self.values = {}
+        self._shared_data = None
+
+    def lookup(self, key):
+        if key not in self.values:
+            self.values[key] = next(((settings.get(key, None), ) for settings in self.sources if settings.has(key)), None)
+        return self.values[key]
+
+    def get(self, key, default=None):
+        value = self.lookup(key)
+        return value[0] if value is not None else default
+
+    def has(self, key):
+        return self.lookup(key) is not None
+
+    def shared_data(self):
+        if self._shared_data is None:
+            self._shared_data = ProjectData({
+                'track_processes': self.get("track_processes", True),
+                'nonblocking': self.get("nonblocking", True),
+                'chunked_output_reader': self.get("chunked_output_reader", False),
+                'exec_args': self.get("exec_args", False),
+                'output_capture_max_lines': self.get("output_capture_max_lines", 1000),
+                'output_capture_max_bytes': self.get("output_capture_max_bytes", 256 * 1024),
+                'output_capture_spill_to_file': self.get("output_capture_spill_to_file", False),
+                'task_metrics_interval_in_seconds': self.get("task_metrics_interval_in_seconds", 0),
+                'task_metrics_warning_cpu_percent': self.get("task_metrics_warning_cpu_percent", 0),
+                'task_metrics_warning_rss_in_mb': self.get("task_metrics_warning_rss_in_mb", 0)
+            })
+        return self._shared_data
+
+
 class ProjectData():
-    def __init__(self, data=None):
+    def __init__(self, data=None, window=None):
         if data is not None:
             self._project_data = data
         else:
-            active_window = sublime.active_window()
+            active_window = window or sublime.active_window()
 
             if is_sublime_text_3 and active_window:
                 project_data = active_window.project_data() or {}
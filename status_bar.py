@@ -5,41 +5,113 @@ is_sublime_text_3 = int(sublime.version()) >= 3000
 if is_sublime_text_3:
     from .settings import Settings
     from .caches import ProcessCache
+    from .process_metrics import ProcessMetrics, TaskUsage
     from .timeout import defer_sync
 else:
     from settings import Settings
     from caches import ProcessCache
+    from process_metrics import ProcessMetrics, TaskUsage
     from timeout import defer_sync
 
 
 class StatusBar():
+    """
+    The status text of each window is computed once and reused until the running processes
+    (ProcessCache.version), the settings (a new snapshot) or, if the format uses them, the metrics change.
+    Activating a view only stamps it.
+    """
+
+    METRICS = ("{cpu}", "{rss}")
+
+    # window id => ((process version, metrics version), settings snapshot, text)
+    _texts = {}
+    refresh_scheduled = False
+    metrics_refresh_scheduled = False
+
+    @classmethod
+    def processes_changed(cls):
+        # Processes change on background threads, every window is repainted once on the main thread
+        if not StatusBar.refresh_scheduled:
+            StatusBar.refresh_scheduled = True
+            defer_sync(StatusBar.refresh_all)
+
+    @classmethod
+    def refresh_all(cls):
+        StatusBar.refresh_scheduled = False
+        for window in sublime.windows():
+            StatusBar(window).update()
+
+    @classmethod
+    def metrics_changed(cls):
+        if not StatusBar.metrics_refresh_scheduled:
+            StatusBar.metrics_refresh_scheduled = True
+            defer_sync(StatusBar.refresh_metrics)
+
+    @classmethod
+    def refresh_metrics(cls):
+        # Only the windows whose format shows the metrics are repainted after each sample
+        StatusBar.metrics_refresh_scheduled = False
+        for window in sublime.windows():
+            status_bar = StatusBar(window)
+            if status_bar.uses_metrics(Settings.snapshot(window)):
+                status_bar.update()
+
     def __init__(self, window):
         self.window = window
-        self.settings = Settings()
 
-    def update(self):
+    def update(self, view=None):
+        view = view or self.window.active_view()
+        if not view:
+            return
+
+        text = self.text()
+        if text is None:
+            view.erase_status(Settings.PACKAGE_NAME)
+        else:
+            view.set_status(Settings.PACKAGE_NAME, text)
+
+    def text(self):
+        snapshot = Settings.snapshot(self.window)
+        version = (ProcessCache.version, ProcessMetrics.version if self.uses_metrics(snapshot) else None)
+
+        cached = StatusBar._texts.get(self.window.id())
+        if cached is not None and cached[0] == version and cached[1] is snapshot:
+            return cached[2]
+
+        text = self.compute(snapshot)
+        StatusBar._texts[self.window.id()] = (version, snapshot, text)
+        return text
+
+    def compute(self, settings):
         if ProcessCache.empty():
-            return self.erase()
+            return None
+
+        status_bar_tasks = settings.get('status_bar_tasks', False)
+        if not status_bar_tasks:
+            return None
+
+        processes = ProcessCache.get()
+        task_names = set([process.get_task_name() for process in processes])
 
-        status_bar_tasks = self.settings.get('status_bar_tasks', False)
+        if status_bar_tasks != True:
+            if not isinstance(status_bar_tasks, list):
+                status_bar_tasks = [status_bar_tasks]
 
-        if status_bar_tasks:
-            task_names = set([process.get_task_name() for process in ProcessCache.get()])
+            task_names = task_names.intersection(set(status_bar_tasks))
 
-            if status_bar_tasks != True:
-                if not isinstance(status_bar_tasks, list):
-                    status_bar_tasks = [status_bar_tasks]
+        if not task_names:
+            return None
 
-                task_names = task_names.intersection(set(status_bar_tasks))
+        usages = [ProcessMetrics.get(process) for process in processes if process.get_task_name() in task_names]
+        usage = TaskUsage.total([usage for usage in usages if usage is not None])
 
-            if task_names:
-                defer_sync(lambda: self.set(', '.join(task_names)))
+        text_format = settings.get('status_bar_format', '{task_name}')
+        return text_format.format(task_name=', '.join(sorted(task_names)), cpu=usage.cpu_text(), rss=usage.rss_text())
 
-    def set(self, text):
-        text_format = self.settings.get('status_bar_format', '{task_name}')
-        status = text_format.format(task_name=text)
-        self.window.active_view().set_status(Settings.PACKAGE_NAME, status)
+    def uses_metrics(self, settings):
+        text_format = settings.get('status_bar_format', '{task_name}') or ''
+        return any(metric in text_format for metric in StatusBar.METRICS)
 
-    def erase(self):
-        self.window.active_view().erase_status(Settings.PACKAGE_NAME)
 
+ProcessCache.add_on_change("status_bar", StatusBar.processes_changed)
+ProcessMetrics.add_on_change("status_bar", StatusBar.metrics_changed)
@@ -0,0 +1,80 @@
+import codecs
+import os
+import tempfile
+from collections import deque
+
+
+class StreamCapture():
+    """
+    Keeps the last `max_lines` lines (and at most `max_bytes` characters) of a process stream.
+    Older lines are dropped or, if `spill_to_file` is set, appended to a temporary file.
+    The file lives until the capture is discarded, or until the plugin is unloaded if it never is.
+    """
+
+    # Spill files not removed yet
+    spill_paths = set()
+
+    @classmethod
+    def remove_spill_files(cls):
+        for path in list(cls.spill_paths):
+            cls.remove_spill_file(path)
+
+    @classmethod
+    def remove_spill_file(cls, path):
+        cls.spill_paths.discard(path)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def __init__(self, max_lines=1000, max_bytes=256 * 1024, spill_to_file=False):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.spill_to_file = spill_to_file
+        self.spill_path = None
+        self.spill_file = None
+        self.lines = deque()
+        self.size = 0
+        self.evicted = 0
+
+    def append(self, line):
+        self.lines.append(line)
+        self.size += len(line)
+
+        while len(self.lines) > 1 and (len(self.lines) > self.max_lines or self.size > self.max_bytes):
+            self.evict(self.lines.popleft())
+
+    def evict(self, line):
+        self.size -= len(line)
+        self.evicted += 1
+        if self.spill_to_file:
+            self.spill(line)
+
+    def spill(self, line):
+        if self.spill_file is None:
+            (fd, self.spill_path) = tempfile.mkstemp(prefix="sublime-gulp-", suffix=".log")
+            os.close(fd)
+            StreamCapture.spill_paths.add(self.spill_path)
+            self.spill_file = codecs.open(self.spill_path, "w", "utf-8", errors='replace')
+        self.spill_file.write(line)
+
+    def text(self):
+        text = "".join(self.lines)
+        if self.evicted:
+            where = ", older output in %s" % self.spill_path if self.spill_path else ""
+            text = "[%d older lines omitted%s]\n%s" % (self.evicted, where, text)
+        return text
+
+    def close(self):
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+
+    def discard(self):
+        self.close()
+        if self.spill_path is not None:
+            StreamCapture.remove_spill_file(self.spill_path)
+            self.spill_path = None
+
+    def __len__(self):
+        return len(self.lines) + self.evicted
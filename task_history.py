@@ -0,0 +1,125 @@
+import sublime
+from threading import Lock, Timer
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .settings import Settings
+    from .caches import CacheFile
+else:
+    from settings import Settings
+    from caches import CacheFile
+
+
+class TaskHistory():
+    """
+    Duration of the last MAX_RUNS runs of each task, stored on the package folder as
+    { gulpfile: { task name: [[started at, duration, exit code, flags], ...] } } (times in seconds).
+    Writes are batched like the ProcessCache ones.
+    """
+
+    FILE_NAME = ".sublime-gulp-history.cache"
+    MAX_RUNS = 100
+    BASELINE_RUNS = 10
+    FLUSH_DELAY = 1
+
+    lock = Lock()
+    runs = None
+    flush_timer = None
+
+    @classmethod
+    def record(cls, task_run):
+        """ Stores a finished TaskRun, returns its TaskTimings """
+        run = [round(task_run.started_at, 3), round(task_run.duration(), 3), task_run.returncode, task_run.task_flag or ""]
+
+        with cls.lock:
+            cls.load()
+            task_runs = cls.runs.setdefault(task_run.gulpfile or task_run.working_dir, {}).setdefault(task_run.task_name, [])
+            task_runs.append(run)
+            del task_runs[:-cls.MAX_RUNS]
+            cls.schedule_flush()
+
+            return TaskTimings(task_run.task_name, task_run.gulpfile, task_runs[:])
+
+    @classmethod
+    def timings(cls):
+        """ TaskTimings of every task, most recently run first """
+        with cls.lock:
+            cls.load()
+            timings = [TaskTimings(task_name, gulpfile, task_runs[:]) for (gulpfile, tasks) in cls.runs.items() for (task_name, task_runs) in tasks.items() if task_runs]
+
+        return sorted(timings, key=lambda timing: timing.last_run()[0], reverse=True)
+
+    @classmethod
+    def load(cls):
+        if cls.runs is None:
+            storage = cls.storage()
+            data = storage.read() if storage.exists() else None
+            cls.runs = data if isinstance(data, dict) else {}
+
+    @classmethod
+    def schedule_flush(cls):
+        if cls.flush_timer is None:
+            cls.flush_timer = Timer(cls.FLUSH_DELAY, cls.flush)
+            cls.flush_timer.daemon = True
+            cls.flush_timer.start()
+
+    @classmethod
+    def flush(cls):
+        with cls.lock:
+            if cls.flush_timer is not None:
+                cls.flush_timer.cancel()
+                cls.flush_timer = None
+            if cls.runs is None:
+                return
+            runs = dict((gulpfile, dict(tasks)) for (gulpfile, tasks) in cls.runs.items())
+
+        try:
+            cls.storage().write(runs)
+        except (IOError, OSError) as e:
+            print("%s: Could not save the task history. %s" % (Settings.PACKAGE_NAME, str(e)))
+
+    @classmethod
+    def storage(cls):
+        return CacheFile(Settings.package_path(), TaskHistory.FILE_NAME, shared=True)
+
+
+class TaskTimings():
+    """ Duration stats of the runs of a task. The baseline is the median of the successful runs before the last one """
+
+    def __init__(self, task_name, gulpfile, runs):
+        self.task_name = task_name
+        self.gulpfile = gulpfile
+        self.runs = runs
+
+    def last_run(self):
+        return self.runs[-1]
+
+    def durations(self):
+        return [run[1] for run in self.runs]
+
+    def percentile(self, percent):
+        durations = sorted(self.durations())
+        index = max(int(round(percent / 100.0 * len(durations))) - 1, 0)
+        return durations[min(index, len(durations) - 1)]
+
+    def baseline(self):
+        previous = [run[1] for run in self.runs[:-1] if run[2] == 0][-TaskHistory.BASELINE_RUNS:]
+        if not previous:
+            return None
+        return sorted(previous)[len(previous) // 2]
+
+    def regression(self, threshold_percent):
+        """ How much slower (as a percentage) the last run was compared to the baseline, None if it's within the threshold """
+        baseline = self.baseline()
+        if not baseline or not threshold_percent:
+            return None
+
+        slower = (self.last_run()[1] - baseline) / baseline * 100
+        return slower if slower >= threshold_percent else None
+
+
+def format_duration(seconds):
+    if seconds < 60:
+        return "%.1fs" % seconds
+    return "%dm %02ds" % (seconds // 60, seconds % 60)
@@ -0,0 +1,46 @@
+import sublime
+import time
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .task_timeline import TaskTimeline
+else:
+    from task_timeline import TaskTimeline
+
+
+class TaskRun():
+    """
+    State of a single task execution.
+    Commands are reused by Sublime for each call, so the values are copied here before the task starts
+    to let concurrent runs of the same command finish with their own data.
+    """
+
+    def __init__(self, working_dir, task_name, task_flag, silent, gulpfile=None):
+        self.working_dir = working_dir
+        self.task_name = task_name
+        self.task_flag = task_flag
+        self.silent = silent
+        self.gulpfile = gulpfile
+        self.process = None
+        self.started_at = None
+        self.finished_at = None
+        self.returncode = None
+        self.timeline = None
+
+    def command(self):
+        return r"gulp %s %s" % (self.task_name, self.task_flag)
+
+    def start(self, process):
+        self.process = process
+        self.started_at = time.time()
+        self.timeline = TaskTimeline(self.command().strip())
+        TaskTimeline.remember(self.timeline)
+
+    def finish(self):
+        self.finished_at = time.time()
+        if self.process is not None:
+            self.returncode = self.process.returncode()
+
+    def duration(self):
+        return self.finished_at - self.started_at
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import re
+import time
+from threading import Lock
+
+
+class TaskTimeline():
+    """
+    Sub-tasks of a single run, parsed as the output streams from gulp's
+    "Starting 'x'..." and "Finished 'x' after 1.23 s" (or "'x' errored after ...") lines.
+    Start offsets are taken when each line arrives, durations from what gulp reports.
+    """
+
+    STARTING = re.compile(r"Starting '(.+?)'\.\.\.")
+    FINISHED = re.compile(u"(?:Finished '(.+?)'|'(.+?)' errored) after ([\\d.]+) (ns|μs|ms|s|min|h)")
+    UNITS = { "ns": 1e-9, u"μs": 1e-6, "ms": 1e-3, "s": 1, "min": 60, "h": 3600 }
+
+    # The timelines of the last MAX_RUNS runs, most recent last. Running tasks (like watchers) are included
+    MAX_RUNS = 20
+    # A watcher logs its sub-tasks on every rebuild, only the last MAX_ENTRIES are kept
+    MAX_ENTRIES = 500
+    recent = []
+
+    @classmethod
+    def remember(cls, timeline):
+        cls.recent.append(timeline)
+        del cls.recent[:-cls.MAX_RUNS]
+
+    @classmethod
+    def with_entries(cls):
+        return [timeline for timeline in cls.recent if timeline.entries]
+
+    def __init__(self, command):
+        self.command = command
+        self.started_at = time.time()
+        self.entries = []
+        self.lock = Lock()
+
+    def feed(self, line):
+        # Cheap check first, most lines are not task events
+        if "'" not in line:
+            return
+
+        starting = TaskTimeline.STARTING.search(line)
+        if starting:
+            with self.lock:
+                self.entries.append(TimelineEntry(starting.group(1), time.time() - self.started_at))
+                del self.entries[:-TaskTimeline.MAX_ENTRIES]
+            return
+
+        finished = TaskTimeline.FINISHED.search(line)
+        if finished:
+            name = finished.group(1) or finished.group(2)
+            duration = float(finished.group(3)) * TaskTimeline.UNITS[finished.group(4)]
+            with self.lock:
+                entry = next((entry for entry in reversed(self.entries) if entry.name == name and entry.duration is None), None)
+                if entry is None:
+                    # Started before we were listening, placed so it ends now
+                    entry = TimelineEntry(name, max(time.time() - self.started_at - duration, 0))
+                    self.entries.append(entry)
+                entry.duration = duration
+                entry.failed = finished.group(2) is not None
+
+    def tree(self):
+        """
+        Returns the root entries, each with its `children` set. A sub-task is nested under the shortest
+        entry that started before it and finished after it, gulp doesn't log which task started it.
+        """
+        with self.lock:
+            entries = sorted(self.entries, key=lambda entry: (entry.start, -(entry.duration or 0)))
+
+        now = time.time() - self.started_at
+        roots = []
+        for entry in entries:
+            entry.children = []
+            parents = [candidate for candidate in entries if candidate is not entry and candidate.contains(entry, now)]
+            if parents:
+                min(parents, key=lambda parent: parent.end(now) - parent.start).children.append(entry)
+            else:
+                roots.append(entry)
+        return roots
+
+    def critical_path(self, roots):
+        """ Following the entries that finished last on each level, the chain that decided when the run ended """
+        now = time.time() - self.started_at
+        path = []
+        level = roots
+        while level:
+            # Sub-tasks that never finish (like watchers) only count if nothing else did
+            finished = [entry for entry in level if entry.duration is not None]
+            last = max(finished or level, key=lambda entry: entry.end(now))
+            path.append(last)
+            level = last.children
+        return path
+
+    def render(self, width=40):
+        roots = self.tree()
+        now = time.time() - self.started_at
+        total = max([entry.end(now) for entry in self.entries] + [0.001])
+        lines = ["Timeline of '%s'" % self.command, "%9s %9s  %s" % ("start", "duration", "task")]
+
+        def add(entry, depth):
+            offset = min(int(entry.start / total * width), width - 1)
+            length = max(int(round((entry.end(now) - entry.start) / total * width)), 1)
+            bar = " " * offset + "=" * min(length, width - offset)
+            name = "  " * depth + entry.name + (" (errored)" if entry.failed else "") + ("" if entry.duration is not None else " (running)")
+            lines.append("%9s %9s  %-40s |%-*s|" % (format_seconds(entry.start), format_seconds(entry.end(now) - entry.start), name, width, bar))
+            for child in entry.children:
+                add(child, depth + 1)
+
+        for root in roots:
+            add(root, 0)
+
+        path = self.critical_path(roots)
+        if path:
+            lines.append("")
+            lines.append("Critical path: %s" % " > ".join("%s (%s)" % (entry.name, format_seconds(entry.end(now) - entry.start)) for entry in path))
+
+            slowest = max(self.entries, key=lambda entry: entry.self_time(now))
+            lines.append("Most time spent on its own: %s (%s)" % (slowest.name, format_seconds(slowest.self_time(now))))
+
+        return "\n".join(lines) + "\n"
+
+
+class TimelineEntry():
+    __slots__ = ("name", "start", "duration", "failed", "children")
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        # None while the sub-task is running
+        self.duration = None
+        self.failed = False
+        self.children = []
+
+    def end(self, now):
+        return self.start + self.duration if self.duration is not None else now
+
+    def contains(self, other, now):
+        # Sub-tasks started at the same time are siblings (like the ones of a parallel task)
+        return self.start < other.start and self.end(now) >= other.end(now)
+
+    def self_time(self, now):
+        """ Duration not covered by any of the children """
+        covered = 0
+        covered_until = self.start
+        for child in sorted(self.children, key=lambda child: child.start):
+            start = max(child.start, covered_until)
+            end = child.end(now)
+            if end > start:
+                covered += end - start
+                covered_until = end
+        return max(self.end(now) - self.start - covered, 0)
+
+
+def format_seconds(seconds):
+    if seconds < 1:
+        return "%dms" % round(seconds * 1000)
+    return "%.2fs" % seconds
@@ -0,0 +1,125 @@
+import sublime
+import fnmatch
+import os
+import re
+
+is_sublime_text_3 = int(sublime.version()) >= 3000
+
+if is_sublime_text_3:
+    from .caches import ProcessCache
+    from .timeout import set_timeout
+else:
+    from caches import ProcessCache
+    from timeout import set_timeout
+
+
+class TasksOnSave():
+    """
+    `tasks_on_save` and `silent_tasks_on_save` of a window compiled to one regex per task.
+    Saves are collected for `tasks_on_save_debounce_in_milliseconds` so each task runs once per burst of saves.
+    The running policy only looks at the tasks running from a folder that holds one of the saved files.
+    """
+
+    _windows = {}
+
+    @classmethod
+    def for_window(cls, window, settings):
+        # The settings snapshot is replaced whenever the settings change, so comparing it and the folders is enough
+        key = (settings.snapshot, window.folders())
+
+        instance = cls._windows.get(window.id())
+        if instance is None or instance.key[0] is not key[0] or instance.key[1] != key[1]:
+            tasks = settings.get("tasks_on_save", {}) or {}
+            silent_tasks = settings.get("silent_tasks_on_save", {}) or {}
+            instance = TasksOnSave(window, key, window.folders(), tasks, silent_tasks)
+            cls._windows[window.id()] = instance
+
+        instance.settings = settings
+        return instance
+
+    def __init__(self, window, key, folders, tasks, silent_tasks):
+        self.window = window
+        self.key = key
+        self.settings = None
+        self.folders = folders
+        self.matchers = self.compile(folders, tasks, False) + self.compile(folders, silent_tasks, True)
+        self.pending = []
+        self.saved_files = []
+        self.generation = 0
+
+    def compile(self, folders, tasks_on_save, silent):
+        matchers = []
+        for task in sorted(tasks_on_save):
+            patterns = tasks_on_save[task]
+            if not isinstance(patterns, list):
+                patterns = [patterns]
+
+            regexes = [fnmatch.translate(os.path.normcase(os.path.join(folder, pattern))) for folder in folders for pattern in patterns]
+            if regexes:
+                matchers.append((task, silent, re.compile("|".join("(?:%s)" % regex for regex in regexes))))
+        return matchers
+
+    def saved(self, file_name):
+        normalized_name = os.path.normcase(file_name)
+        matched = [(task, silent) for (task, silent, regex) in self.matchers if regex.match(normalized_name)]
+        if not matched:
+            return
+
+        for task in matched:
+            if task not in self.pending:
+                self.pending.append(task)
+
+        if file_name not in self.saved_files:
+            self.saved_files.append(file_name)
+
+        debounce = self.settings.get("tasks_on_save_debounce_in_milliseconds", 0)
+        if debounce:
+            self.generation += 1
+            generation = self.generation
+            set_timeout(lambda: self.dispatch(generation), debounce)
+        else:
+            self.dispatch(self.generation)
+
+    def dispatch(self, generation):
+        # A newer save restarted the wait
+        if generation != self.generation or not self.pending:
+            return
+
+        pending = self.pending
+        saved_files = self.saved_files
+        self.pending = []
+        self.saved_files = []
+
+        if self.settings.get("kill_before_save_tasks", False):
+            self.window.run_command("gulp_kill", { "silent": True })
+
+        policy = self.settings.get("tasks_on_save_running_policy", "run")
+
+        for (task, silent) in pending:
+            running = [process for process in ProcessCache.get() if process.get_task_name().split(" ")[0] == task and self.runs_on(process, saved_files)]
+
+            if running and policy == "skip":
+                continue
+            if policy == "restart":
+                for process in running:
+                    self.kill(process)
+
+            self.window.run_command("gulp", { "task_name": task, "silent": silent })
+
+    def runs_on(self, process, saved_files):
+        # A task runs from the folder of its gulpfile (or the project folder), which has to hold a saved file.
+        # Same named tasks of other projects or sibling gulpfiles are left alone
+        if not any(self.contains(folder, process.working_dir) for folder in self.folders):
+            return False
+        return any(self.contains(process.working_dir, file_name) for file_name in saved_files)
+
+    def contains(self, folder, path):
+        folder = os.path.normcase(os.path.normpath(folder))
+        path = os.path.normcase(os.path.normpath(path))
+        return path == folder or path.startswith(os.path.join(folder, ""))
+
+    def kill(self, process):
+        try:
+            process.kill()
+        except OSError:
+            print("Process %d seems to be dead already" % process.pid)
@@ -0,0 +1,83 @@
+"use strict";
+
+// Long lived version of write_tasks_to_cache.js
+// Reads one JSON request per line from stdin ({ "id": 1, "cwd": "/path/to/gulpfile/folder" }) and answers with
+// RESPONSE_PREFIX + { "id": 1 } or { "id": 1, "error": "message" } once the cache of that folder is written.
+// The node module cache is kept between requests so the plugins required by the gulpfile only load once.
+
+var fs = require("fs"),
+    readline = require("readline"),
+    writeTasksToCache = require("./write_tasks_to_cache.js").writeTasksToCache;
+
+var RESPONSE_PREFIX = "@@sublime-gulp@@ ";
+
+var loadedMtimes = {};
+
+var mtimeOf = function(filepath) {
+    try {
+        return fs.statSync(filepath).mtime.getTime();
+    } catch(ex) {
+        return null;
+    }
+};
+
+var isLocalModule = function(filepath) {
+    return !/[\\\/]node_modules[\\\/]/.test(filepath);
+};
+
+var isGulpInstance = function(filepath) {
+    // gulp exports a single instance, a new one is needed to register the tasks again
+    return /[\\\/]node_modules[\\\/]gulp[\\\/]index\.js$/.test(filepath);
+};
+
+var evictModules = function() {
+    Object.keys(require.cache).forEach(function(filepath) {
+        if (filepath === __filename || filepath === require.resolve("./write_tasks_to_cache.js")) {
+            return;
+        }
+
+        var changed = loadedMtimes[filepath] !== mtimeOf(filepath);
+
+        if (changed || isLocalModule(filepath) || isGulpInstance(filepath)) {
+            delete require.cache[filepath];
+            delete loadedMtimes[filepath];
+        }
+    });
+};
+
+var rememberModules = function() {
+    Object.keys(require.cache).forEach(function(filepath) {
+        if (!(filepath in loadedMtimes)) {
+            loadedMtimes[filepath] = mtimeOf(filepath);
+        }
+    });
+};
+
+var respond = function(response) {
+    process.stdout.write(RESPONSE_PREFIX + JSON.stringify(response) + "\n");
+};
+
+var handle = function(line) {
+    var request;
+
+    try {
+        request = JSON.parse(line);
+    } catch(ex) {
+        return respond({ error: "Invalid request: " + line });
+    }
+
+    try {
+        evictModules();
+        process.chdir(request.cwd);
+        writeTasksToCache(request.cwd);
+        respond({ id: request.id });
+    } catch(ex) {
+        respond({ id: request.id, error: String(ex && ex.stack || ex) });
+    } finally {
+        rememberModules();
+    }
+};
+
+readline.createInterface({ input: process.stdin, terminal: false })
+    .on("line", handle)
+    .on("close", function() { process.exit(0); });
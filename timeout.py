@@ -14,9 +14,9 @@ def defer_sync(fn):
     set_timeout(fn, 0)
 
 def defer(fn):
-    async(fn, 0)
+    run_async(fn, 0)
 
-def async(fn, delay, silent=False):
+def run_async(fn, delay, silent=False):
     if is_sublime_text_3:
         if silent:
             sublime.set_timeout_async(fn, delay)
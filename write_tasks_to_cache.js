@@ -2,14 +2,9 @@
 
 var path = require("path"),
     fs = require("fs"),
-    crypto = require("crypto"),
-    shasum = crypto.createHash("sha1");
+    crypto = require("crypto");
 
-var cwd = process.cwd();
-
-var cachePath    = path.join(cwd, ".sublime-gulp.cache");
-var tmpfilePath  = path.join(cwd, ".sublime-gulp-tmp.js");
-var gulpfilePath = (function() {
+var getGulpfilePath = function(cwd) {
     var allowedExtensions = [".babel.js", ".js"];
     for(var i = 0; i < allowedExtensions.length; i++) {
         var filepath = path.join(cwd, "gulpfile" + allowedExtensions[i]);
@@ -17,9 +12,9 @@ var gulpfilePath = (function() {
             return filepath;
         }
     }
-})();
+};
 
-var requireGulp = function(gulpfilePath) {
+var requireGulp = function(gulpfilePath, tmpfilePath) {
     // Creates a temporal file exporting gulp at the end (so it can be retrived by node) and then requires it (related: http://goo.gl/QYzRAO)
     var fileSrc = fs.readFileSync(gulpfilePath);
     fileSrc += "\n/**/;module.exports = gulp;";
@@ -27,31 +22,60 @@ var requireGulp = function(gulpfilePath) {
     try {
         return require(tmpfilePath);
     } catch(ex) {
-        fs.unlink(tmpfilePath);
+        fs.unlinkSync(tmpfilePath);
         throw ex;
     }
 };
 var generatesha1 = function(filepath) {
+    var shasum = crypto.createHash("sha1");
     var content = fs.readFileSync(filepath);
     shasum.update("blob " + content.length + "\0", "utf8");
     shasum.update(content);
     return shasum.digest("hex");
 };
+var generateListingsha1 = function(dirpath) {
+    var shasum = crypto.createHash("sha1");
+    var names = fs.readdirSync(dirpath).filter(function(name) { return name[0] !== "."; }).sort();
+    shasum.update(names.join("\n"), "utf8");
+    return shasum.digest("hex");
+};
+var getLoadedFiles = function(cwd, tmpfilePath) {
+    // Local files required while evaluating the gulpfile (ignoring node_modules and this package)
+    var files = {};
+    var folders = {};
+
+    Object.keys(require.cache).forEach(function(filepath) {
+        var isDependency = /[\\\/]node_modules[\\\/]/.test(filepath);
+        var isPackageFile = path.dirname(filepath) === __dirname;
+
+        if (filepath !== tmpfilePath && !isDependency && !isPackageFile && fs.existsSync(filepath)) {
+            files[filepath] = generatesha1(filepath);
+
+            // Folders are tracked too so new files loaded by something like require-dir are noticed
+            var dirpath = path.dirname(filepath);
+            if (dirpath !== cwd && !folders[dirpath]) {
+                folders[dirpath] = generateListingsha1(dirpath);
+            }
+        }
+    });
+
+    return { files: files, folders: folders };
+};
 var getJSONFromFile = function(filepath) {
     if(fs.existsSync(filepath)) {
         var content = fs.readFileSync(filepath, { encoding: "utf8" });
         return JSON.parse(content);
     }
 };
-var forEachTask = function(fn) {
+var forEachTask = function(gulp, fn) {
     if(gulp.tasks) {
-        _forEachTask3x(fn);
+        _forEachTask3x(gulp, fn);
     } else {
-        _forEachTask4x(fn);
+        _forEachTask4x(gulp, fn);
     }
 };
 
-var _forEachTask3x = function(fn) {
+var _forEachTask3x = function(gulp, fn) {
     for(var task in gulp.tasks) {
         if (gulp.tasks.hasOwnProperty(task)) {
             fn(gulp.tasks[task].name, gulp.tasks[task].dep);
@@ -59,7 +83,7 @@ var _forEachTask3x = function(fn) {
     }
 };
 
-var _forEachTask4x = function(fn) {
+var _forEachTask4x = function(gulp, fn) {
     var tasksTree = gulp.tree({ deep: true })
     var iterable = tasksTree.forEach ? tasksTree : tasksTree.nodes
 
@@ -80,27 +104,42 @@ var _forEachTask4x = function(fn) {
     });
 };
 
-var gulp = requireGulp(gulpfilePath);
-var sha1 = generatesha1(gulpfilePath);
-var gulpsublimecache = getJSONFromFile(cachePath) || {};
+var writeTasksToCache = function(cwd) {
+    var cachePath    = path.join(cwd, ".sublime-gulp.cache");
+    var tmpfilePath  = path.join(cwd, ".sublime-gulp-tmp.js");
+    var gulpfilePath = getGulpfilePath(cwd);
 
-if (!gulpsublimecache[gulpfilePath] || gulpsublimecache[gulpfilePath].sha1 !== sha1) {
+    var gulp = requireGulp(gulpfilePath, tmpfilePath);
+    var sha1 = generatesha1(gulpfilePath);
+    var loadedFiles = getLoadedFiles(cwd, tmpfilePath);
+    var gulpsublimecache = getJSONFromFile(cachePath) || {};
     var tasks = {};
 
-    forEachTask(function(name, deps) {
+    // The package only runs this script when the cache is outdated (the gulpfile or any of the files it loaded changed)
+    forEachTask(gulp, function(name, deps) {
         tasks[name] = {
             name: name,
             dependencies: deps.join(" ")
         };
     });
 
-    gulpsublimecache[gulpfilePath] = gulpsublimecache[gulpfilePath] || {};
     gulpsublimecache[gulpfilePath] = {
         sha1: sha1,
+        files: loadedFiles.files,
+        folders: loadedFiles.folders,
         tasks: tasks
     };
 
     fs.writeFileSync(cachePath, JSON.stringify(gulpsublimecache));
-}
 
-fs.unlinkSync(tmpfilePath);
+    fs.unlinkSync(tmpfilePath);
+};
+
+module.exports = {
+    writeTasksToCache: writeTasksToCache
+};
+
+// Run directly by the package (`node write_tasks_to_cache.js`) or required by tasks_worker.js
+if (require.main === module) {
+    writeTasksToCache(process.cwd());
+}